@@ -21,21 +21,19 @@ args=parser.parse_args()
 s=scanner.UnidenScanner(args.dev,args.speed)
 if not s.get_scan_settings(): print "get_scan_settings() returned 0"
 sd=s.systems[args.sys_index].dump() #dump data to temp var
-sd['groups']=[] # zeroize group list, now this list for new grp only
 groups=yaml.load(file(args.grp_config,'r'))
-sd['groups']=groups # assign new groups
+sd['groups']=groups # existing groups are matched by type and name, others appended
 s.enter_program_mode() # do not forget to enter program mode
-s.systems[args.sys_index].load(**sd) # update data in memory
-s.systems[args.sys_index].set_data() # commit data to scanner
+s.systems[args.sys_index].load(merge=True, **sd) # update data in memory
+s.systems[args.sys_index].set_data(modified_only=True) # commit changed data to scanner
 s.systems[args.sys_index].get_data() # update data from scanner
 
 if args.grp_index and args.chn_config:
 	gd=s.systems[args.sys_index].groups[args.grp_index].dump() #dump data to temp var
-	gd['channels']=[] # zeroize channel list, now this list for new chn only
 	channels=yaml.load(file(args.chn_config,'r')) 
-	gd['channels']=channels # assign new channels
-	s.systems[args.sys_index].groups[args.grp_index].load(**gd) # update data in memory
-	s.systems[args.sys_index].groups[args.grp_index].set_data() # commit data to scanner
+	gd['channels']=channels # existing channels are matched by frequency, others appended
+	s.systems[args.sys_index].groups[args.grp_index].load(merge=True, **gd) # update data in memory
+	s.systems[args.sys_index].groups[args.grp_index].set_data(modified_only=True) # commit changed data to scanner
 	s.systems[args.sys_index].groups[args.grp_index].get_data() # update data from scanner
 
 s.exit_program_mode()
@@ -0,0 +1,121 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import time
+import sqlite3
+import logging
+
+class ActivityLog:
+
+	"""Activity log of reception hits in SQLite database.
+
+	Hits are buffered and written in one transaction per BATCH hits or
+	after INTERVAL seconds, whichever comes first. Use on_event() as
+	ReceptionMonitor callback and poll() as its poller, so hits are written
+	without waiting for the next one, or log_hit() with get_reception_status()
+	dictionary and call poll() periodically. SCANNER is stored with every
+	hit to tell scanners apart."""
+
+	tables = ('CREATE TABLE IF NOT EXISTS hits (start REAL, duration REAL, frq_tgid TEXT, '
+			'system TEXT, grp TEXT, channel TEXT, sys_tag TEXT, chan_tag TEXT, '
+			'p25nac TEXT, mod TEXT, scanner TEXT)',
+		'CREATE INDEX IF NOT EXISTS hits_start ON hits (start)',
+		'CREATE INDEX IF NOT EXISTS hits_frq_tgid ON hits (frq_tgid, start)',
+		'CREATE INDEX IF NOT EXISTS hits_system ON hits (system, start)')
+
+	def __init__(self, path, batch=100, interval=5.0, scanner=''):
+
+		self.logger = logging.getLogger('uniden_api.ActivityLog')
+
+		self.batch = batch
+		self.interval = interval
+		self.scanner = scanner
+		self.pending = []
+		self.flushed = time.time()
+
+		self.db = sqlite3.connect(path)
+		self.db.execute('PRAGMA journal_mode=WAL')
+		self.db.execute('PRAGMA synchronous=NORMAL')
+		for sql in self.tables: self.db.execute(sql)
+		self.db.commit()
+
+	def log_hit(self, status, start, duration=0):
+
+		"""Buffers hit of get_reception_status() dictionary STATUS."""
+
+		self.pending.append((start, duration, status['frq_tgid'], status['name1'],
+				status['name2'], status['name3'], status['sys_tag'],
+				status['chan_tag'], status['p25nac'], status['mod'], self.scanner))
+
+		if len(self.pending) >= self.batch: self.flush()
+		else: self.poll()
+
+	def poll(self):
+
+		"""Flushes buffered hits if INTERVAL seconds passed since the last flush."""
+
+		if time.time()-self.flushed >= self.interval: self.flush()
+
+	def on_event(self, event):
+
+		"""ReceptionMonitor callback, logs hit on its end event."""
+
+		if event.kind == 'end': self.log_hit(event.status, event.time-event.duration, event.duration)
+
+	def flush(self):
+
+		"""Writes buffered hits in one transaction."""
+
+		self.flushed = time.time()
+		if not self.pending: return
+
+		with self.db:
+			self.db.executemany('INSERT INTO hits VALUES (?,?,?,?,?,?,?,?,?,?,?)', self.pending)
+
+		self.pending = []
+
+	def close(self):
+
+		self.flush()
+		self.db.close()
+
+	def query(self, sql, args=()):
+
+		"""Flushes buffered hits and returns query result as list of dictionaries."""
+
+		self.flush()
+		cur = self.db.execute(sql, args)
+		names = [c[0] for c in cur.description]
+
+		return [dict(zip(names, row)) for row in cur]
+
+	def top_talkers(self, since=3600, limit=10):
+
+		"""Returns LIMIT frequencies/TGIDs with the longest total airtime
+		in the last SINCE seconds."""
+
+		return self.query('SELECT frq_tgid, system, grp, channel, COUNT(*) AS hits, '
+				'SUM(duration) AS airtime FROM hits WHERE start >= ? '
+				'GROUP BY frq_tgid, system, grp, channel ORDER BY airtime DESC LIMIT ?',
+				(time.time()-since, limit))
+
+	def channel_activity(self, since=86400*7):
+
+		"""Returns hits and airtime per channel per day (UTC) in the last SINCE seconds."""
+
+		return self.query("SELECT date(start, 'unixepoch') AS day, system, grp, channel, "
+				'frq_tgid, COUNT(*) AS hits, SUM(duration) AS airtime FROM hits '
+				'WHERE start >= ? GROUP BY day, system, grp, channel, frq_tgid '
+				'ORDER BY day, system, grp, channel',
+				(time.time()-since,))
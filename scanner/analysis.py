@@ -0,0 +1,133 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+# Analysis of RSSI sweeps (see sweep.py), requires numpy.
+# RSSI arrays are 1D (one sweep, value per frequency) or 2D (sweeps x
+# frequencies, e.g. Waterfall.array()), sweeps are never looped in Python.
+
+import numpy
+from uniden import frq_format
+
+def noise_floor(rssi, bands=None, percentile=25):
+
+	"""Estimates noise floor as PERCENTILE of RSSI. With BANDS (band number
+	per frequency, e.g. Sweep.band) the floor is estimated per band.
+	Returns array of floor per frequency."""
+
+	rssi = numpy.asarray(rssi)
+	size = rssi.shape[-1]
+
+	if bands is None:
+		return numpy.repeat(numpy.percentile(rssi, percentile), size)
+
+	bands = numpy.asarray(bands)
+	floor = numpy.empty(size)
+
+	for band in numpy.unique(bands):
+		mask = bands == band
+		floor[mask] = numpy.percentile(rssi[..., mask], percentile)
+
+	return floor
+
+def active(rssi, floor, threshold=10):
+
+	"""Returns boolean array, True where RSSI is THRESHOLD or more above FLOOR."""
+
+	return numpy.asarray(rssi) >= numpy.asarray(floor)+threshold
+
+def find_peaks(rssi, floor, threshold=10):
+
+	"""Returns indexes of local maxima of one sweep RSSI which are
+	THRESHOLD or more above FLOOR. Flat tops report their first point."""
+
+	r = numpy.asarray(rssi, dtype=numpy.int32)
+	if not len(r): return numpy.array([], dtype=numpy.intp)
+
+	padded = numpy.concatenate(([r[0]-1], r, [r[-1]-1]))
+	top = (r > padded[:-2]) & (r >= padded[2:])
+
+	return numpy.flatnonzero(top & active(r, floor, threshold))
+
+def occupancy_stats(rssi, floor, threshold=10, times=None):
+
+	"""Returns dictionary of per frequency statistics of 2D RSSI.
+
+	OCCUPANCY	Fraction of sweeps with the frequency active
+	DUTY_CYCLE	Fraction of time the frequency is active, sweeps are
+			weighted by time to the next sweep (TIMES, e.g.
+			Waterfall.timestamps()), equals OCCUPANCY without TIMES
+	HITS		Number of idle to active transitions
+	PEAK		Maximal RSSI
+	MEAN		Mean RSSI"""
+
+	rssi = numpy.atleast_2d(rssi)
+	on = active(rssi, floor, threshold)
+
+	occupancy = on.mean(axis=0)
+
+	if times is None or len(times) < 2:
+		duty_cycle = occupancy
+	else:
+		dt = numpy.diff(numpy.asarray(times, dtype=numpy.float64))
+		dt = numpy.append(dt, numpy.median(dt))
+		duty_cycle = (on*dt[:, numpy.newaxis]).sum(axis=0)/dt.sum()
+
+	hits = on[0].astype(numpy.int32)+(on[1:] & ~on[:-1]).sum(axis=0)
+
+	return {'occupancy':occupancy, 'duty_cycle':duty_cycle, 'hits':hits,
+		'peak':rssi.max(axis=0), 'mean':rssi.mean(axis=0)}
+
+def candidates(score, min_score=0.05):
+
+	"""Returns indexes of frequencies with SCORE (e.g. occupancy) at least
+	MIN_SCORE. A run of adjacent frequencies is one signal wider than
+	search step, only its best scored frequency is returned."""
+
+	score = numpy.asarray(score, dtype=numpy.float64)
+	on = score >= min_score
+	if not on.any(): return numpy.array([], dtype=numpy.intp)
+
+	starts = on & ~numpy.concatenate(([False], on[:-1]))
+	runs = numpy.cumsum(starts)[on]
+	idx = numpy.flatnonzero(on)
+
+	# sort by run, then by score descending, take first of every run
+	order = numpy.lexsort((-score[idx], runs))
+	first = numpy.concatenate(([True], runs[order][1:] <> runs[order][:-1]))
+
+	return numpy.sort(idx[order][first])
+
+def export_channels(frqs, score, min_score=0.05, mods='AUTO', limit=None):
+
+	"""Exports candidate active frequencies as list of Channel.load()
+	dictionaries for Group.load(channels=...) or Group.load_channels().
+	FRQS are integer frequencies (100 Hz units, e.g. Sweep.frqs), MODS
+	modulation per frequency or one for all. With LIMIT only the best
+	scored LIMIT channels are exported, in frequency order."""
+
+	frqs = numpy.asarray(frqs)
+	score = numpy.asarray(score, dtype=numpy.float64)
+
+	idx = candidates(score, min_score)
+	if limit is not None and len(idx) > limit:
+		idx = numpy.sort(idx[numpy.argsort(-score[idx], kind='mergesort')[:limit]])
+
+	channels = []
+
+	for i in idx:
+		f = frq_format(int(frqs[i]))
+		mod = isinstance(mods, basestring) and mods or mods[i]
+		channels.append({'name':f, 'frequency':f, 'modulation':mod})
+
+	return channels
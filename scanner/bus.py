@@ -0,0 +1,194 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import time
+import logging
+import threading
+from collections import deque
+
+# topic to UnidenScanner getter
+topics = {'GLG':'get_reception_status', 'STS':'get_current_status', 'PWR':'get_rssi_power',
+	'BAV':'get_battery_voltage', 'WIN':'get_window_voltage'}
+
+class Subscription:
+
+	"""Subscription to TOPIC readings at RATE per second.
+
+	Readings are (topic, time, value) tuples queued up to MAXLEN, the
+	oldest reading is dropped when the queue is full, DROPPED counts them."""
+
+	def __init__(self, bus, topic, rate, maxlen):
+
+		self.bus = bus
+		self.topic = topic
+		self.rate = rate
+		self.interval = 1.0/rate
+		self.queue = deque(maxlen=maxlen)
+		self.dropped = 0
+		self.delivered = 0
+		self.last = 0
+		self.cond = threading.Condition(threading.Lock())
+
+	def put(self, reading):
+
+		with self.cond:
+			if len(self.queue) == self.queue.maxlen: self.dropped += 1
+			self.queue.append(reading)
+			self.delivered += 1
+			self.cond.notify()
+
+	def get(self, timeout=None):
+
+		"""Returns the oldest queued reading, waits up to TIMEOUT
+		seconds (forever if None). Returns None on timeout."""
+
+		with self.cond:
+			if not self.queue: self.cond.wait(timeout)
+			if not self.queue: return None
+			return self.queue.popleft()
+
+	def get_all(self):
+
+		"""Returns list of all queued readings, does not wait."""
+
+		with self.cond:
+			l = list(self.queue)
+			self.queue.clear()
+			return l
+
+	def __len__(self):
+
+		return len(self.queue)
+
+	def close(self):
+
+		self.bus.unsubscribe(self)
+
+class ScannerBus:
+
+	"""Publishes scanner readings of GLG, STS, PWR, BAV and WIN to subscribers.
+
+	One poller thread reads every topic at the highest rate of its
+	subscribers, each subscriber gets readings at its own rate. Topics
+	without subscribers are not polled. Failed reads are not published.
+	The scanner should not be used by other threads while the bus runs."""
+
+	def __init__(self, scanner):
+
+		self.logger = logging.getLogger('uniden_api.ScannerBus')
+
+		self.scanner = scanner
+		self.subscriptions = dict([(t,[]) for t in topics])
+		self.due = dict([(t,0) for t in topics])
+		self.lock = threading.Lock()
+		self.thread = None
+		self.running = False
+
+	def subscribe(self, topic, rate=1.0, maxlen=100):
+
+		"""Subscribes to TOPIC at RATE readings per second. Returns Subscription."""
+
+		if topic not in topics: raise KeyError('unknown topic %s' % topic)
+
+		s = Subscription(self, topic, rate, maxlen)
+		with self.lock: self.subscriptions[topic].append(s)
+
+		return s
+
+	def unsubscribe(self, subscription):
+
+		with self.lock:
+			if subscription in self.subscriptions[subscription.topic]:
+				self.subscriptions[subscription.topic].remove(subscription)
+
+	def interval(self, topic):
+
+		"""Returns polling interval of TOPIC, None if nobody subscribed."""
+
+		with self.lock: subs = list(self.subscriptions[topic])
+		if not subs: return None
+
+		return min([s.interval for s in subs])
+
+	def publish(self, topic, value, t=None):
+
+		"""Publishes VALUE of TOPIC to subscribers which are due."""
+
+		if t is None: t = time.time()
+
+		with self.lock: subs = list(self.subscriptions[topic])
+
+		for s in subs:
+			# small tolerance, so subscriber at polling rate gets every reading
+			if t-s.last >= s.interval*0.9:
+				s.last = t
+				s.put((topic, t, value))
+
+	def poll(self):
+
+		"""Reads and publishes topics which are due.
+		Returns seconds to the next due topic."""
+
+		now = time.time()
+		wait = 1.0
+
+		for topic in topics:
+
+			interval = self.interval(topic)
+			if interval is None: continue
+
+			if now >= self.due[topic]:
+				value = getattr(self.scanner, topics[topic])()
+				t = time.time()
+				if value: self.publish(topic, value, t)
+				else: self.logger.error('poll(): %s failed' % topic)
+				# first read of a topic is not counted as overdue
+				if self.due[topic]: self.due[topic] = max(self.due[topic]+interval, t)
+				else: self.due[topic] = t+interval
+
+			wait = min(wait, self.due[topic]-time.time())
+
+		return max(wait, 0)
+
+	def run(self):
+
+		"""Polls until stop()."""
+
+		self.running = True
+
+		while self.running:
+			try:
+				delay = self.poll()
+			except Exception, e:
+				self.logger.error('run(): %s' % str(e))
+				delay = 0.1
+			if delay: time.sleep(delay)
+
+	def start(self):
+
+		"""Starts poller thread."""
+
+		if self.thread and self.thread.is_alive(): return
+
+		self.thread = threading.Thread(target=self.run, name='ScannerBus')
+		self.thread.daemon = True
+		self.thread.start()
+
+	def stop(self, timeout=None):
+
+		"""Stops poller thread and waits for it."""
+
+		self.running = False
+		if self.thread: self.thread.join(timeout)
+		self.thread = None
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import csv
+import logging
+from constants import *
+from uniden import frq_parse, FrequencyError
+
+module_logger = logging.getLogger('uniden_api.csvimport')
+
+# CSV column (lower case) to Channel.load() argument
+csv_columns={'name':'name', 'alpha tag':'name', 'alphatag':'name', 'channel name':'name',
+		'frequency':'frequency', 'frequency output':'frequency', 'freq':'frequency',
+		'output':'frequency', 'modulation':'modulation', 'mode':'modulation', 'mod':'modulation',
+		'tone':'tone', 'pl tone':'tone', 'ctcss':'tone', 'dcs':'tone', 'ctcss/dcs':'tone',
+		'tone/nac':'tone', 'nac':'tone', 'p25nac':'tone', 'p25 nac':'tone',
+		'lockout':'lockout', 'priority':'priority', 'attenuate':'attenuate',
+		'attenuation':'attenuate', 'att':'attenuate', 'number tag':'tag', 'number_tag':'tag',
+		'alert tone':'alert_tone', 'alert_tone':'alert_tone', 'alert level':'alert_level',
+		'alert_level':'alert_level', 'alert color':'alert_color', 'alert_color':'alert_color',
+		'alert pattern':'pattern', 'pattern':'pattern', 'audio type':'audio_type',
+		'audio_type':'audio_type', 'volume offset':'vol_offset', 'vol_offset':'vol_offset'}
+
+# CSV modulation to scanner modulation and audio type
+csv_modes={'AUTO':('AUTO','all'), 'AM':('AM','all'), 'FM':('FM','all'), 'NFM':('NFM','all'),
+		'FMN':('NFM','all'), 'WFM':('WFM','all'), 'FMW':('WFM','all'), 'FMB':('FMB','all'),
+		'P25':('NFM','digital'), 'DE':('NFM','digital'), 'FMNA':('NFM','analog')}
+
+def tone_from_csv(tone):
+
+	"""Converts CSV tone to (dcs, p25nac) pair of Channel.load() values.
+
+	'127.3 PL', '127.3'		CTCSS		('127.3Hz', '')
+	'023 DPL', 'D023', 'DCS 023'	DCS		('023', '')
+	'$293', '293 NAC'		P25 NAC		('all', '293')
+	'', 'CSQ'			none		('all', '')"""
+
+	t=tone.strip().upper()
+
+	if t in ('','CSQ','NONE'): return ('all','')
+
+	if t.startswith('$') or t.endswith('NAC'):
+		return ('all',t.strip('$').replace('NAC','').strip())
+
+	if t.endswith('DPL') or t.startswith('D'):
+		code=t.replace('DPL','').replace('DCS','').strip('D ').rstrip('NI ')
+		if code in scanner_ctcss_dcs: return (code,'')
+
+	else:
+		pl=t.replace('PL','').replace('HZ','').strip()
+		try:
+			pl='%.1fHz' % float(pl)
+		except ValueError:
+			pl=''
+		if pl in scanner_ctcss_dcs: return (pl,'')
+
+	raise ValueError('unknown tone %s' % tone)
+
+def channel_from_csv(row):
+
+	"""Converts CSV row dictionary with known column names to Channel.load() dictionary."""
+
+	d={}
+
+	for k,v in row.items():
+		if k is None or v is None: continue
+		arg=csv_columns.get(k.strip().lower())
+		if arg and v.strip(): d[arg]=v.strip()
+
+	if 'frequency' not in d: raise ValueError('no frequency')
+
+	try:
+		frq_parse(d['frequency'])
+
+	except FrequencyError, e:
+		raise ValueError(str(e))
+
+	mode=d.pop('modulation','AUTO').upper()
+	if mode not in csv_modes: raise ValueError('unknown modulation %s' % mode)
+	d['modulation'],audio_type=csv_modes[mode]
+	d.setdefault('audio_type',audio_type)
+
+	if 'tone' in d: d['dcs'],d['p25nac']=tone_from_csv(d.pop('tone'))
+
+	d.setdefault('name',d['frequency'])
+
+	return d
+
+def read_channels_csv(fname):
+
+	"""Reads CSV file with header row to list of Channel.load() dictionaries.
+	Returns 0 if any row is bad, nothing is created in this case."""
+
+	channels=[]
+
+	with open(fname,'rb') as f:
+
+		for n,row in enumerate(csv.DictReader(f)):
+
+			try:
+				channels.append(channel_from_csv(row))
+
+			except ValueError, e:
+				module_logger.error('read_channels_csv(): %s line %d: %s' % (fname,n+2,str(e)))
+				return 0
+
+	return channels
+
+def load_channels_csv(group, fname, depth=8):
+
+	"""Bulk loads conventional channels from CSV file to group and sets them to device.
+	See Group.load_channels(). Returns number of channels created."""
+
+	channels=read_channels_csv(fname)
+	if channels == 0: return 0
+
+	return group.load_channels(channels, depth)
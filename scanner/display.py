@@ -0,0 +1,146 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import time
+import logging
+from uniden import *
+
+class DisplayDecoder:
+
+	"""Decodes STS replies keeping the previous frame, reports changes only.
+
+	Changes are dictionary of changed keys with new values:
+
+	DSP_FORM			Display form
+	LINES			Dictionary of line number (0-7) to (CHAR, MODE)
+	SQL, MUT, BAT, WAT, SIG_LVL,
+	BK_COLOR, BK_DIMMER	Indicators
+
+	The first frame reports everything. An identical reply is not parsed."""
+
+	indicators = ('sql','mut','bat','wat','sig_lvl','bk_color','bk_dimmer')
+
+	def __init__(self):
+
+		self.res = None
+		self.frame = None
+
+	def reset(self):
+
+		"""Forgets previous frame, next update() reports everything."""
+
+		self.res = None
+		self.frame = None
+
+	def update(self, res):
+
+		"""Decodes STS reply RES, returns dictionary of changes ({} if none).
+		Raises RecordFormatError on bad reply, previous frame is kept."""
+
+		if res == self.res: return {}
+
+		frame = sts_parse(res)
+		old = self.frame or {'dsp_form':None, 'char':(None,)*STS_LINES, 'mode':(None,)*STS_LINES}
+
+		changes = {}
+
+		if frame['dsp_form'] <> old['dsp_form']: changes['dsp_form'] = frame['dsp_form']
+
+		lines = {}
+		for i in xrange(STS_LINES):
+			if frame['char'][i] <> old['char'][i] or frame['mode'][i] <> old['mode'][i]:
+				lines[i] = (frame['char'][i], frame['mode'][i])
+		if lines: changes['lines'] = lines
+
+		for k in self.indicators:
+			if frame[k] <> old.get(k): changes[k] = frame[k]
+
+		self.res = res
+		self.frame = frame
+
+		return changes
+
+class DisplayPoller:
+
+	"""Polls STS every INTERVAL seconds, passes changes of DisplayDecoder
+	to callbacks added with add_callback(). Nothing is passed for
+	unchanged display."""
+
+	def __init__(self, scanner, interval=0.2):
+
+		self.logger = logging.getLogger('uniden_api.DisplayPoller')
+
+		self.scanner = scanner
+		self.interval = interval
+		self.decoder = DisplayDecoder()
+		self.callbacks = []
+		self.running = False
+
+	def add_callback(self, callback):
+
+		"""Adds callback called with changes dictionary."""
+
+		self.callbacks.append(callback)
+
+	def remove_callback(self, callback):
+
+		self.callbacks.remove(callback)
+
+	def poll(self):
+
+		"""Polls display once, returns changes dictionary."""
+
+		try:
+			res = self.scanner.raw('STS')
+			return self.decoder.update(res)
+
+		except (CommandError, RecordFormatError), e:
+			self.logger.error('poll(): %s' % str(e))
+			return {}
+
+	def changes(self, duration=None):
+
+		"""Generator of changes, polls for DURATION seconds or until stop()."""
+
+		self.running = True
+		end = duration and time.time()+duration
+
+		while self.running and not (end and time.time() >= end):
+
+			t = time.time()
+
+			changes = self.poll()
+			if changes: yield changes
+
+			delay = t+self.interval-time.time()
+			if delay > 0: time.sleep(delay)
+
+		self.running = False
+
+	def run(self, duration=None):
+
+		"""Polls for DURATION seconds or until stop(), calls callbacks for every change."""
+
+		for changes in self.changes(duration):
+			for callback in self.callbacks:
+				try:
+					callback(changes)
+				except Exception, ex:
+					self.logger.error('run(): callback %s' % str(ex))
+
+	def stop(self):
+
+		"""Stops polling loop, may be called from callback or other thread."""
+
+		self.running = False
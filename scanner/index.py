@@ -0,0 +1,210 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import logging
+from bisect import bisect_left, bisect_right
+from uniden import *
+
+class ProgramIndex:
+
+	"""Index of channels, TGIDs and trunk frequencies of the program tree.
+
+	FRQS		Sorted frequencies (100 Hz units) for range queries,
+			RECORDS holds the record of every FRQS item
+	TGIDS		TGID to list of TalkGroupID
+	NAMES		Name to list of Channel and TalkGroupID
+	TAGS		Number tag to list of records
+	SLOTS		Channel index to record
+
+	The index observes the scanner (see UnidenScanner.add_observer()), so
+	appended, deleted, read and loaded records are indexed as they change.
+	Call build() after the tree is replaced, e.g. by UnidenScanner.get_scan_settings()."""
+
+	def __init__(self, scanner, observe=True):
+
+		self.logger = logging.getLogger('uniden_api.ProgramIndex')
+
+		self.scanner = scanner
+		self.clear()
+		self.build()
+
+		if observe: scanner.add_observer(self.on_change)
+
+	def clear(self):
+
+		self.frqs = []
+		self.records = []
+		self.tgids = {}
+		self.names = {}
+		self.tags = {}
+		self.keys = {}
+		self.slots = {}
+
+	def close(self):
+
+		"""Stops observing the scanner."""
+
+		if self.on_change in self.scanner.observers: self.scanner.remove_observer(self.on_change)
+
+	def build(self):
+
+		"""Indexes the whole program tree of the scanner."""
+
+		self.clear()
+
+		for s in self.scanner.systems.values(): self.add_tree(s)
+
+	def add_tree(self, record):
+
+		for r in self.leaves(record): self.add(r)
+
+	def remove_tree(self, record):
+
+		for r in self.leaves(record): self.remove(r)
+
+	def leaves(self, record):
+
+		"""Returns list of channels, TGIDs and trunk frequencies of RECORD subtree."""
+
+		if isinstance(record, (Channel, TalkGroupID, TrunkFrequency)): return [record]
+
+		l = []
+
+		for attr in ('groups','sites','channels','tgids','trunk_frqs'):
+			for r in getattr(record, attr, {}).values(): l.extend(self.leaves(r))
+
+		return l
+
+	def add(self, r):
+
+		"""Indexes channel, TGID or trunk frequency R, reindexes it if known."""
+
+		if r in self.keys: self.remove(r)
+
+		# record read again from the scanner replaces the old one
+		old = self.slots.get(r.chn_index)
+		if old is not None and old is not r: self.remove(old)
+
+		frq = getattr(r, 'frq', '')
+		tgid = getattr(r, 'tgid', '')
+		name = getattr(r, 'name', '')
+		tag = r.number_tag
+
+		try:
+			frq = frq and frq_value(frq) or 0
+
+		except FrequencyError:
+			frq = 0
+
+		if frq:
+			i = bisect_right(self.frqs, frq)
+			self.frqs.insert(i, frq)
+			self.records.insert(i, r)
+
+		if tgid: self.tgids.setdefault(tgid, []).append(r)
+		if name: self.names.setdefault(name, []).append(r)
+		if tag and tag <> 'NONE': self.tags.setdefault(tag, []).append(r)
+
+		self.keys[r] = (frq, tgid, name, tag)
+		if r.chn_index is not None: self.slots[r.chn_index] = r
+
+	def remove(self, r):
+
+		"""Removes R from index."""
+
+		if r not in self.keys: return
+
+		frq, tgid, name, tag = self.keys.pop(r)
+		if self.slots.get(r.chn_index) is r: del self.slots[r.chn_index]
+
+		if frq:
+			for i in xrange(bisect_left(self.frqs, frq), bisect_right(self.frqs, frq)):
+				if self.records[i] is r:
+					del self.frqs[i]
+					del self.records[i]
+					break
+
+		for m,k in ((self.tgids, tgid), (self.names, name), (self.tags, tag)):
+			if k in m and r in m[k]:
+				m[k].remove(r)
+				if not m[k]: del m[k]
+
+	def on_change(self, event, record, owner):
+
+		"""UnidenScanner observer."""
+
+		if event == 'delete':
+			self.remove_tree(record)
+
+		elif event == 'append':
+			self.add_tree(record)
+
+		elif event == 'update' and (record in self.keys or record.chn_index is not None):
+			self.add(record)
+
+	def by_frequency(self, frq):
+
+		"""Returns list of records of frequency FRQ (see frq_value())."""
+
+		f = frq_value(frq)
+
+		return self.records[bisect_left(self.frqs, f):bisect_right(self.frqs, f)]
+
+	def by_range(self, lower, upper):
+
+		"""Returns list of records with frequency from LOWER to UPPER inclusive, sorted."""
+
+		return self.records[bisect_left(self.frqs, frq_value(lower)):bisect_right(self.frqs, frq_value(upper))]
+
+	def nearest(self, frq, tolerance=0):
+
+		"""Returns list of records with frequency nearest to FRQ, not farther
+		than TOLERANCE (100 Hz units)."""
+
+		f = frq_value(frq)
+		i = bisect_left(self.frqs, f)
+
+		best = [d for d in (i < len(self.frqs) and self.frqs[i]-f, i > 0 and f-self.frqs[i-1])
+				if d is not False and d <= tolerance]
+		if not best: return []
+
+		d = min(best)
+		l = []
+		if i < len(self.frqs) and self.frqs[i]-f == d: l.extend(self.by_frequency(f+d))
+		if d and i > 0 and f-self.frqs[i-1] == d: l.extend(self.by_frequency(f-d))
+
+		return l
+
+	def by_tgid(self, tgid):
+
+		return list(self.tgids.get(str(tgid), []))
+
+	def by_name(self, name):
+
+		return list(self.names.get(name, []))
+
+	def by_tag(self, tag):
+
+		return list(self.tags.get(str(tag), []))
+
+	def locate(self, r):
+
+		"""Returns (system, group or site) of record R, (None, None) if not in the tree."""
+
+		s = self.scanner.systems.get(r.sys_index)
+		if not s: return (None, None)
+
+		if isinstance(r, TrunkFrequency): return (s, s.sites.get(r.grp_index))
+
+		return (s, s.groups.get(r.grp_index))
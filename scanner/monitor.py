@@ -0,0 +1,166 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import time
+import logging
+
+class HitEvent:
+
+	"""Reception hit event.
+
+	KIND		'start' or 'end'
+	KEY		(FRQ/TGID, NAME1, NAME2, NAME3) of the hit
+	TIME		Event time, seconds since epoch
+	DURATION	Hit duration in seconds, 0 for start event
+	STATUS		get_reception_status() dictionary of the hit start"""
+
+	def __init__(self, kind, key, t, duration, status):
+
+		self.kind = kind
+		self.key = key
+		self.time = t
+		self.duration = duration
+		self.status = status
+
+	def __repr__(self):
+
+		return 'HitEvent(%s, %s, %.3f)' % (self.kind, '/'.join(self.key), self.duration)
+
+class ReceptionMonitor:
+
+	"""Polls reception status (GLG) and turns it to hit start and end events.
+
+	Polling is adaptive: every FAST seconds while squelch is open, backing
+	off by BACKOFF factor up to SLOW seconds while idle. Events are passed
+	to callbacks added with add_callback() and yielded by events().
+	Pollers added with add_poller() are called after every poll of events(),
+	e.g. ActivityLog.poll()."""
+
+	def __init__(self, scanner, fast=0.05, slow=0.5, backoff=1.5):
+
+		self.logger = logging.getLogger('uniden_api.ReceptionMonitor')
+
+		self.scanner = scanner
+		self.fast = fast
+		self.slow = slow
+		self.backoff = backoff
+		self.interval = fast
+		self.callbacks = []
+		self.pollers = []
+		self.hit = None
+		self.running = False
+
+	def add_callback(self, callback):
+
+		"""Adds callback called with HitEvent for every event."""
+
+		self.callbacks.append(callback)
+
+	def remove_callback(self, callback):
+
+		self.callbacks.remove(callback)
+
+	def add_poller(self, poller):
+
+		"""Adds poller called without arguments after every poll of events() and run()."""
+
+		self.pollers.append(poller)
+
+	def remove_poller(self, poller):
+
+		self.pollers.remove(poller)
+
+	def poll(self):
+
+		"""Polls reception status once, adapts polling interval.
+		Returns list of events, callbacks are not called."""
+
+		status = self.scanner.get_reception_status()
+		if not status: return []
+
+		now = time.time()
+		events = []
+
+		if status['frq_tgid'] and status['sql'] == '1':
+			key = (status['frq_tgid'],status['name1'],status['name2'],status['name3'])
+			self.interval = self.fast
+		else:
+			key = None
+			self.interval = min(self.slow, self.interval*self.backoff)
+
+		if self.hit and self.hit[0] <> key:
+			events.append(HitEvent('end', self.hit[0], now, now-self.hit[1], self.hit[2]))
+			self.hit = None
+
+		if key and not self.hit:
+			self.hit = (key, now, status)
+			events.append(HitEvent('start', key, now, 0, status))
+
+		return events
+
+	def flush(self):
+
+		"""Ends current hit, if any. Returns list of events."""
+
+		if not self.hit: return []
+
+		now = time.time()
+		e = HitEvent('end', self.hit[0], now, now-self.hit[1], self.hit[2])
+		self.hit = None
+
+		return [e]
+
+	def events(self, duration=None):
+
+		"""Generator of events, polls for DURATION seconds or until stop().
+		Current hit is ended when polling stops."""
+
+		self.running = True
+		end = duration and time.time()+duration
+
+		while self.running and not (end and time.time() >= end):
+
+			t = time.time()
+
+			for e in self.poll(): yield e
+
+			for poller in self.pollers:
+				try:
+					poller()
+				except Exception, ex:
+					self.logger.error('events(): poller %s' % str(ex))
+
+			delay = t+self.interval-time.time()
+			if delay > 0: time.sleep(delay)
+
+		self.running = False
+
+		for e in self.flush(): yield e
+
+	def run(self, duration=None):
+
+		"""Polls for DURATION seconds or until stop(), calls callbacks for every event."""
+
+		for e in self.events(duration):
+			for callback in self.callbacks:
+				try:
+					callback(e)
+				except Exception, ex:
+					self.logger.error('run(): callback %s' % str(ex))
+
+	def stop(self):
+
+		"""Stops polling loop, may be called from callback or other thread."""
+
+		self.running = False
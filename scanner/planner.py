@@ -0,0 +1,128 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import yaml
+import logging
+
+# memory blocks taken by one record
+blocks = {'systems':1, 'sites':1, 'groups':1, 'channels':1, 'tgids':1, 'trunk_frqs':1}
+
+# scanner limits, see UnidenScanner.get_used_memory_blocks()
+limits = {'systems':500, 'sites':1000, 'channels':25000}
+
+# commands per record: append (CSY, AST, AGC/AGT, ACC, ACT) and set_data()
+# (SIN, SIF, GIN, CIN, TIN, TFQ), systems set QGL and trunked systems TRN too
+create_cmds = {'systems':1, 'sites':1, 'groups':1, 'channels':1, 'tgids':1, 'trunk_frqs':1}
+set_cmds = {'systems':2, 'trunked':1, 'sites':1, 'groups':1, 'channels':1, 'tgids':1, 'trunk_frqs':1}
+
+def count_records(systems=[], groups=[], sites=[]):
+
+	"""Counts records created by loading lists of System.load(), Group.load()
+	and Site.load() dictionaries. Returns dictionary of counts: systems,
+	trunked (not conventional systems), sites, groups, channels, tgids, trunk_frqs."""
+
+	c = dict([(k,0) for k in ('systems','trunked','sites','groups','channels','tgids','trunk_frqs')])
+
+	for s in systems:
+		c['systems'] += 1
+		if s.get('type', 'conventional') <> 'conventional': c['trunked'] += 1
+		groups = groups+list(s.get('groups', []))
+		sites = sites+list(s.get('sites', []))
+
+	for g in groups:
+		c['groups'] += 1
+		c['channels'] += len(g.get('channels', []))
+		c['tgids'] += len(g.get('tgids', []))
+
+	for s in sites:
+		c['sites'] += 1
+		c['trunk_frqs'] += len(s.get('trunk_frqs', []))
+
+	return c
+
+class LoadPlan:
+
+	"""Preflight plan of a bulk load.
+
+	COUNTS		Records to create, see count_records()
+	BLOCKS		Memory blocks needed
+	COMMANDS	Commands to create records and set their data
+	SECONDS		Estimated time at measured link latency
+	PROBLEMS	List of reasons the load will not fit, after check()"""
+
+	def __init__(self, scanner, systems=[], groups=[], sites=[]):
+
+		self.logger = logging.getLogger('uniden_api.LoadPlan')
+
+		self.scanner = scanner
+		self.counts = count_records(systems, groups, sites)
+		self.blocks = sum([n*blocks[k] for k,n in self.counts.items() if k in blocks])
+		self.commands = sum([n*create_cmds.get(k,0)+n*set_cmds.get(k,0) for k,n in self.counts.items()])
+		self.seconds = None
+		self.problems = []
+
+	@classmethod
+	def from_yaml(cls, scanner, fname):
+
+		"""Plans UnidenScanner.load_scan_settings() of YAML file FNAME."""
+
+		return cls(scanner, yaml.load(file(fname, 'r')) or [])
+
+	def estimate(self):
+
+		"""Estimates load time in seconds from link latency, measured if
+		not known yet. Returns it, None on error."""
+
+		if not self.scanner.latency and not self.scanner.measure_latency(): return None
+
+		self.seconds = self.commands*self.scanner.latency
+
+		return self.seconds
+
+	def check(self):
+
+		"""Checks plan against free memory blocks (RMB) and scanner limits (MEM).
+		Returns 1 if the load fits, 0 otherwise, reasons are in PROBLEMS."""
+
+		self.problems = []
+
+		if not self.scanner.get_free_memory_blocks() or not self.scanner.get_used_memory_blocks():
+			self.problems.append('cannot read scanner memory')
+			return 0
+
+		free = int(self.scanner.free_memory_blocks)
+		if self.blocks > free:
+			self.problems.append('%d memory blocks needed, %d free' % (self.blocks, free))
+
+		used = self.scanner.used_memory_blocks
+		new = {'systems':self.counts['systems'], 'sites':self.counts['sites'],
+			'channels':self.counts['channels']+self.counts['tgids']+self.counts['trunk_frqs']}
+
+		for k in ('systems','sites','channels'):
+			if int(used[k])+new[k] > limits[k]:
+				self.problems.append('%d %s, %s exist, limit %d' % (new[k], k, used[k], limits[k]))
+
+		for p in self.problems: self.logger.error('check(): %s' % p)
+
+		return not self.problems and 1 or 0
+
+	def report(self):
+
+		"""Returns dictionary of the plan."""
+
+		d = dict(self.counts)
+		d.update({'blocks':self.blocks, 'commands':self.commands, 'seconds':self.seconds,
+			'problems':list(self.problems)})
+
+		return d
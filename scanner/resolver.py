@@ -0,0 +1,139 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import logging
+from uniden import *
+
+class ReceptionResolver:
+
+	"""Resolves get_reception_status() dictionaries to program records.
+
+	Resolution is dictionary:
+
+	SYSTEM, GROUP, RECORD		System, Group and Channel or TalkGroupID objects
+	LOCKOUT				Record lockout (unlock/lockout)
+	SYSTEM_LOCKOUT, GROUP_LOCKOUT	System and group lockout
+	PRIORITY			Record priority (on/off)
+	ALERT_TONE, ALERT_LEVEL,
+	ALERT_COLOR, ALERT_PATTERN	Record alert settings
+
+	Hits are matched by system and channel number tags (SYS_TAG, CHAN_TAG),
+	then by system, group and channel names (NAME1, NAME2, NAME3), same
+	names are told apart by FRQ_TGID. The join of the tree and resolved
+	hits are cached, the cache is dropped on any tree change reported by
+	the scanner (see UnidenScanner.add_observer()) or by invalidate().
+	Up to MAXSIZE resolved hits are kept."""
+
+	def __init__(self, scanner, observe=True, maxsize=4096):
+
+		self.logger = logging.getLogger('uniden_api.ReceptionResolver')
+
+		self.scanner = scanner
+		self.maxsize = maxsize
+		self.invalidate()
+
+		if observe: scanner.add_observer(self.on_change)
+
+	def close(self):
+
+		"""Stops observing the scanner."""
+
+		if self.on_change in self.scanner.observers: self.scanner.remove_observer(self.on_change)
+
+	def invalidate(self):
+
+		"""Drops join and resolution caches, they are rebuilt on next resolve()."""
+
+		self.by_tags = None
+		self.by_names = None
+		self.resolved = {}
+
+	def on_change(self, event, record, owner):
+
+		"""UnidenScanner observer."""
+
+		self.invalidate()
+
+	def join(self):
+
+		"""Builds join of systems, groups and their channels or TGIDs."""
+
+		self.by_tags = {}
+		self.by_names = {}
+
+		for s in self.scanner.systems.values():
+			for g in s.groups.values():
+				for r in g.channels.values()+g.tgids.values():
+
+					j = (s, g, r)
+
+					if s.number_tag <> 'NONE' and r.number_tag <> 'NONE':
+						self.by_tags.setdefault((s.number_tag, r.number_tag), []).append(j)
+
+					self.by_names.setdefault((s.name, g.name, r.name), []).append(j)
+
+	def match(self, joins, frq_tgid):
+
+		"""Returns join of JOINS matching FRQ_TGID, the only join if there is one."""
+
+		if len(joins) == 1: return joins[0]
+
+		for j in joins:
+			r = j[2]
+			if isinstance(r, TalkGroupID):
+				if r.tgid == frq_tgid: return j
+				continue
+			try:
+				if frq_value(r.frq) == frq_value(frq_tgid): return j
+			except FrequencyError:
+				pass
+
+		return None
+
+	def resolve(self, status):
+
+		"""Returns resolution of reception STATUS, None for no or unknown hit."""
+
+		if not status or not status['frq_tgid']: return None
+
+		key = (status['frq_tgid'], status['name1'], status['name2'], status['name3'],
+			status['sys_tag'], status['chan_tag'])
+
+		if key in self.resolved: return self.resolved[key]
+
+		if self.by_names is None: self.join()
+
+		j = None
+
+		tags = (status['sys_tag'], status['chan_tag'])
+		if tags in self.by_tags: j = self.match(self.by_tags[tags], status['frq_tgid'])
+
+		if not j:
+			names = (status['name1'], status['name2'], status['name3'])
+			j = self.match(self.by_names.get(names, []), status['frq_tgid'])
+
+		d = None
+
+		if j:
+			s,g,r = j
+			d = {'system':s, 'group':g, 'record':r, 'lockout':human_lout.get(r.lout),
+				'system_lockout':human_lout.get(s.lout), 'group_lockout':human_lout.get(g.lout),
+				'priority':human_onoff.get(r.pri), 'alert_tone':human_alert_tones.get(r.alt),
+				'alert_level':human_alert_tlevels.get(r.altl), 'alert_color':r.alt_color,
+				'alert_pattern':human_altp.get(r.alt_pattern)}
+
+		if len(self.resolved) >= self.maxsize: self.resolved.clear()
+		self.resolved[key] = d
+
+		return d
@@ -0,0 +1,211 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import time
+import logging
+
+class PeriodicRead:
+
+	"""Periodic read scheduled by Scheduler.
+
+	NAME		Read name, e.g. 'GLG'
+	FUNC		Callable doing the read, e.g. scanner.get_reception_status
+	RATE		Requested rate, reads per second
+	PRIORITY	Higher priority reads keep their rate when budget is short
+	COST		Scanner commands per read
+	CALLBACK	Called with FUNC result, if any
+	ALLOCATED	Rate allocated by Scheduler.plan()
+	COUNT		Reads done"""
+
+	def __init__(self, name, func, rate, priority=0, cost=1, callback=None):
+
+		self.name = name
+		self.func = func
+		self.rate = float(rate)
+		self.priority = priority
+		self.cost = cost
+		self.callback = callback
+		self.allocated = self.rate
+		self.count = 0
+		self.errors = 0
+		self.due = 0
+
+class Scheduler:
+
+	"""Runs periodic reads within serial command budget.
+
+	Budget is UTILIZATION of commands per second the link can do, from
+	measured command latency. When requested rates exceed budget, reads
+	are served by priority, reads of the same priority are slowed down
+	equally and every read keeps at least MIN_RATE (or its requested rate
+	if lower). Latency is re-measured from reads and plan is refreshed
+	every REPLAN seconds."""
+
+	def __init__(self, scanner, utilization=0.8, min_rate=0.05, replan=10.0):
+
+		self.logger = logging.getLogger('uniden_api.Scheduler')
+
+		self.scanner = scanner
+		self.utilization = utilization
+		self.min_rate = min_rate
+		self.replan = replan
+		self.reads = []
+		self.latency = None
+		self.started = 0
+		self.planned = 0
+		self.running = False
+
+	def add(self, name, func, rate, priority=0, cost=1, callback=None):
+
+		"""Adds periodic read, see PeriodicRead. Returns it."""
+
+		r = PeriodicRead(name, func, rate, priority, cost, callback)
+		self.reads.append(r)
+		self.planned = 0
+
+		return r
+
+	def remove(self, name):
+
+		self.reads = [r for r in self.reads if r.name <> name]
+		self.planned = 0
+
+	def measure_latency(self, cmd='MDL', count=10):
+
+		"""Measures link latency, see UnidenScanner.measure_latency()."""
+
+		self.latency = self.scanner.measure_latency(cmd, count)
+		self.planned = 0
+
+		return self.latency
+
+	def budget(self):
+
+		"""Returns command budget per second."""
+
+		if not self.latency: self.measure_latency()
+		if not self.latency: return 0
+
+		return self.utilization/self.latency
+
+	def plan(self):
+
+		"""Allocates rates of reads within budget. Returns budget."""
+
+		budget = self.budget()
+		left = budget
+
+		# floors first, so low priority reads are slowed down, not starved
+		for r in self.reads:
+			r.allocated = min(r.rate, self.min_rate)
+			left -= r.allocated*r.cost
+
+		for p in sorted(set([r.priority for r in self.reads]), reverse=True):
+
+			group = [r for r in self.reads if r.priority == p]
+			demand = sum([(r.rate-r.allocated)*r.cost for r in group])
+			if demand <= 0: continue
+
+			scale = max(0.0, min(1.0, left/demand))
+			for r in group: r.allocated += (r.rate-r.allocated)*scale
+			left -= demand*scale
+
+		for r in self.reads:
+			if r.allocated < r.rate:
+				self.logger.warning('plan(): %s at %.3f/s of %.3f/s' % (r.name, r.allocated, r.rate))
+
+		self.planned = time.time()
+
+		return budget
+
+	def step(self):
+
+		"""Does the most overdue read, the higher priority on a tie.
+		Returns seconds to the next due read."""
+
+		now = time.time()
+		if not self.planned or now-self.planned >= self.replan: self.plan()
+
+		due = [r for r in self.reads if r.allocated > 0 and r.due <= now]
+		if not due:
+			if not self.reads: return self.replan
+			return max(0, min([r.due for r in self.reads if r.allocated > 0] or [now+self.replan])-now)
+
+		r = min(due, key=lambda r: (r.due, -r.priority))
+
+		t = time.time()
+		dt = None
+		try:
+			res = r.func()
+			# callback time is not link latency
+			dt = time.time()-t
+			if r.callback and res: r.callback(res)
+		except Exception, e:
+			r.errors += 1
+			self.logger.error('step(): %s %s' % (r.name, str(e)))
+		if dt is None: dt = time.time()-t
+
+		# exponentially weighted latency from reads
+		if self.latency: self.latency = 0.9*self.latency+0.1*dt/r.cost
+		else: self.latency = dt/r.cost
+
+		r.count += 1
+		r.due = max(r.due+1.0/r.allocated, t)
+
+		return 0
+
+	def run(self, duration=None):
+
+		"""Runs reads for DURATION seconds or until stop()."""
+
+		self.running = True
+		self.started = time.time()
+		for r in self.reads:
+			r.count = 0
+			r.errors = 0
+			r.due = self.started
+
+		end = duration and self.started+duration
+
+		while self.running and not (end and time.time() >= end):
+			delay = self.step()
+			if end: delay = min(delay, end-time.time())
+			if delay > 0: time.sleep(delay)
+
+		self.running = False
+
+	def stop(self):
+
+		"""Stops run loop, may be called from callback or other thread."""
+
+		self.running = False
+
+	def report(self):
+
+		"""Returns list of dictionaries per read: name, priority, requested,
+		allocated and actual rates, count and errors, plus latency and
+		budget of the link, None until latency is measured. Nothing is
+		sent to the scanner."""
+
+		elapsed = time.time()-self.started
+		budget = self.latency and self.utilization/self.latency or None
+		l = []
+
+		for r in self.reads:
+			actual = elapsed > 0 and r.count/elapsed or 0
+			l.append({'name':r.name, 'priority':r.priority, 'requested':r.rate,
+				'allocated':r.allocated, 'actual':actual, 'count':r.count,
+				'errors':r.errors, 'latency':self.latency, 'budget':budget})
+
+		return l
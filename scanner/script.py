@@ -0,0 +1,265 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import logging
+from uniden import *
+
+# commands creating records, reply carries the new index
+create_cmds = ('CSY','AGC','AGT','AST','ACC','ACT')
+
+class CommandScript:
+
+	"""Ordered command script of offline edits, see OfflineScanner.
+
+	CMDS		Commands in order
+	DEFINES		Position of create command to placeholder of the index
+			it returns ('@1', '@2', ...)
+
+	Placeholders stand for indexes of records created by the script and
+	are resolved by ScriptPlayer when the create command answers.
+	Saved as text, one command per line, creates as '@1=CSY,CNV,0'."""
+
+	def __init__(self):
+
+		self.cmds = []
+		self.defines = {}
+
+	def __len__(self):
+
+		return len(self.cmds)
+
+	def append(self, cmd):
+
+		self.cmds.append(cmd)
+
+	def create(self, cmd):
+
+		"""Appends create command. Returns placeholder of the new index."""
+
+		p = '@%d' % (len(self.defines)+1)
+		self.defines[len(self.cmds)] = p
+		self.cmds.append(cmd)
+
+		return p
+
+	def placeholders(self):
+
+		return set(self.defines.values())
+
+	def save(self, fname):
+
+		f = file(fname, 'w')
+
+		for i,cmd in enumerate(self.cmds):
+			if i in self.defines: f.write('%s=' % self.defines[i])
+			f.write(cmd+'\n')
+
+		f.close()
+
+	@classmethod
+	def from_file(cls, fname):
+
+		s = cls()
+
+		for line in file(fname, 'r'):
+			line = line.strip()
+			if not line: continue
+
+			if line.startswith('@') and '=' in line:
+				p,cmd = line.split('=',1)
+				s.defines[len(s.cmds)] = p
+				line = cmd
+
+			s.cmds.append(line)
+
+		return s
+
+class OfflineScanner(UnidenScanner):
+
+	"""Scanner without device, compiling program tree edits to SCRIPT.
+
+	s=OfflineScanner()
+	s.load_scan_settings('examples/conv.yml')
+	for i in s.systems: s.systems[i].set_data()
+	s.script.save('conv.scr')
+
+	Creates, set commands and deletes are recorded in order, creates
+	answer with index placeholders (see CommandScript). Program Mode
+	commands are accepted and not recorded, reads fail with CommandError
+	as there is no device to answer them."""
+
+	def __init__(self, model=None, version=None):
+
+		self.script = CommandScript()
+
+		UnidenScanner.__init__(self, None)
+
+		self.logger = logging.getLogger('uniden_api.OfflineScanner')
+		self.model = model
+		self.version = version
+
+	def open(self, port, speed):
+
+		pass
+
+	def close(self):
+
+		pass
+
+	def raw(self, cmd):
+
+		"""Records CMD to script, see OfflineScanner."""
+
+		name = cmd.split(',')[0]
+
+		if name in ('PRG','EPG'): return '%s,OK' % name
+
+		s = schemas.get(name)
+
+		# set commands carry every settable field, queries only indexes
+		if s and (not s.read_write or len(cmd.split(',')) <> len(s.set)+1):
+			self.logger.error('raw(): no device to read %s' % cmd)
+			raise CommandError
+
+		self.logger.debug('raw(): cmd %s' % cmd)
+
+		if name in create_cmds: return '%s,%s' % (name, self.script.create(cmd))
+
+		self.script.append(cmd)
+
+		return '%s,OK' % name
+
+	def raw_pipeline(self, cmds, depth=8):
+
+		replies = []
+
+		for i,cmd in enumerate(cmds):
+			try:
+				replies.append(self.raw(cmd))
+
+			except CommandError:
+				raise CommandError(i, cmd, '', replies)
+
+		return replies
+
+class ScriptPlayer:
+
+	"""Replays CommandScript to scanner in Program Mode.
+
+	Commands are pipelined up to DEPTH deep, a batch ends before the first
+	command using a placeholder of a create still in the batch. Indexes
+	returned by creates are bound to their placeholders as batches are
+	answered. Replay stops at the first error, see report().
+
+	Program tree of the scanner is not updated, read it with
+	get_scan_settings() after replay."""
+
+	def __init__(self, script, depth=8):
+
+		self.logger = logging.getLogger('uniden_api.ScriptPlayer')
+
+		self.script = script
+		self.depth = depth
+		self.reset()
+
+	def reset(self):
+
+		self.bound = {}
+		self.done = 0
+		self.error = None
+
+	def bind(self, cmd):
+
+		"""Returns CMD with bound placeholders replaced by indexes."""
+
+		return ','.join([self.bound.get(f,f) for f in cmd.split(',')])
+
+	def play(self, scanner):
+
+		"""Replays script to SCANNER. Returns 1 on success, 0 on error."""
+
+		self.reset()
+
+		places = self.script.placeholders()
+
+		with scanner.program_mode():
+
+			batch = []
+			pending = set()
+
+			for i,cmd in enumerate(self.script.cmds):
+
+				used = set(cmd.split(',')) & places
+				if batch and (used & pending or len(batch) >= self.depth):
+					if not self.flush(scanner, batch): return 0
+					batch = []
+					pending = set()
+
+				if i in self.script.defines: pending.add(self.script.defines[i])
+				batch.append(i)
+
+			if batch and not self.flush(scanner, batch): return 0
+
+		return 1
+
+	def flush(self, scanner, batch):
+
+		cmds = [self.bind(self.script.cmds[i]) for i in batch]
+
+		try:
+			replies = scanner.raw_pipeline(cmds, self.depth)
+
+		except CommandError, e:
+			j, cmd, res = e.args[:3]
+			self.done = batch[j]
+			self.error = {'position':batch[j], 'cmd':cmd, 'script_cmd':self.script.cmds[batch[j]],
+				'res':res, 'unknown':batch[j+1:], 'executed':[]}
+			self.logger.error('play(): %d %s %s' % (batch[j], cmd, res))
+			return 0
+
+		for k,(i,res) in enumerate(zip(batch, replies)):
+			if i not in self.script.defines: continue
+
+			cmd = self.script.cmds[i].split(',')[0]
+			index = schemas[cmd].parse(res).values()[0]
+
+			if index == '-1':
+				self.done = i
+				self.error = {'position':i, 'cmd':self.bind(self.script.cmds[i]),
+					'script_cmd':self.script.cmds[i], 'res':res,
+					'unknown':[], 'executed':batch[k+1:]}
+				self.logger.error('play(): %d %s no free memory' % (i, cmd))
+				return 0
+
+			self.bound[self.script.defines[i]] = index
+
+		self.done = batch[-1]+1
+
+		return 1
+
+	def report(self):
+
+		"""Returns dictionary of the last replay:
+
+		COMMANDS	Commands in script
+		DONE		Commands confirmed by scanner
+		BOUND		Placeholder to index map
+		ERROR		None or dictionary of failed command POSITION, CMD as
+				sent, SCRIPT_CMD, scanner reply RES, UNKNOWN list of
+				positions sent after it in the same batch whose result
+				is unknown and EXECUTED list of positions sent after it
+				in the same batch and answered by scanner"""
+
+		return {'commands':len(self.script), 'done':self.done,
+			'bound':dict(self.bound), 'error':self.error}
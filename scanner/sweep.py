@@ -0,0 +1,217 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import time
+import logging
+from uniden import *
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+def step_to_frq(stp):
+
+	"""Converts search step of get_default_band_coverage() (10 Hz units,
+	e.g. '833' for 8.33k) to float in 100 Hz frequency units."""
+
+	return int(stp)/10.0
+
+def sweep_frqs(start, stop, step):
+
+	"""Returns numpy array of integer frequencies (100 Hz units) from
+	START to STOP inclusive. START and STOP are integers in 100 Hz
+	units, STEP is float in the same units, fractional steps such as
+	8.33k are rounded to the nearest 100 Hz per point."""
+
+	if step <= 0: raise FrequencyError('sweep_frqs(): step must be positive')
+
+	n = int((stop-start)/step+1e-9)+1
+
+	return numpy.rint(start+numpy.arange(n)*step).astype(numpy.int32)
+
+class Waterfall:
+
+	"""Ring buffer of the last ROWS sweeps of SIZE points.
+
+	DATA		ROWS x SIZE array of RSSI, oldest row overwritten first
+	TIMES		Sweep start time of every row, seconds since epoch
+	COUNT		Number of sweeps appended so far"""
+
+	def __init__(self, rows, size):
+
+		self.data = numpy.zeros((rows, size), dtype=numpy.int16)
+		self.times = numpy.zeros(rows)
+		self.count = 0
+
+	def append(self, rssi, t=None):
+
+		row = self.count % len(self.data)
+		self.data[row] = rssi
+		self.times[row] = t is None and time.time() or t
+		self.count += 1
+
+	def __len__(self):
+
+		return min(self.count, len(self.data))
+
+	def array(self):
+
+		"""Returns filled rows in chronological order (copy)."""
+
+		if self.count <= len(self.data): return self.data[:self.count].copy()
+
+		return numpy.roll(self.data, -(self.count % len(self.data)), axis=0)
+
+	def timestamps(self):
+
+		"""Returns times of array() rows."""
+
+		if self.count <= len(self.data): return self.times[:self.count].copy()
+
+		return numpy.roll(self.times, -(self.count % len(self.data)))
+
+class Sweep:
+
+	"""RSSI sweep of FRQS (integers, 100 Hz units) with pipelined QSC commands.
+
+	MODS		Modulation per point or one modulation for all points
+	DEPTH		Pipeline depth, see UnidenScanner.raw_pipeline()
+	QSC		Other set_curfrq_reception_status() arguments
+
+	Commands are built once, every sweep() only sends them and parses
+	RSSI into numpy array. The scanner should be in Scan or Hold mode,
+	QSC is invalid in Menu Mode."""
+
+	qsc_defaults = {'att':0, 'dly':0, 'code_srch':0, 'bsc':'0000000000000000',
+			'rep':0, 'agc_analog':0, 'agc_digital':0, 'p25waiting':200}
+
+	def __init__(self, scanner, frqs, mods='AUTO', depth=8, **qsc):
+
+		if numpy is None: raise UnidenScannerError('Sweep requires numpy')
+
+		self.logger = logging.getLogger('uniden_api.Sweep')
+
+		self.scanner = scanner
+		self.depth = depth
+		self.frqs = numpy.asarray(frqs, dtype=numpy.int32)
+
+		if isinstance(mods, basestring): mods = [mods]*len(self.frqs)
+		if len(mods) <> len(self.frqs):
+			raise UnidenScannerError('Sweep(): %d modulations for %d frequencies'
+						% (len(mods), len(self.frqs)))
+
+		for mod in set(mods):
+			if mod not in mod_values: raise ModulationError
+
+		d = dict(self.qsc_defaults)
+		d.update(qsc)
+		schema = schemas['QSC']
+		self.cmds = []
+		for f,mod in zip(self.frqs, mods):
+			d['frq'] = frq_encode(int(f))
+			d['mod'] = mod
+			self.cmds.append(schema.format(d))
+
+		self.rssi = numpy.zeros(len(self.frqs), dtype=numpy.int16)
+		self.sql = numpy.zeros(len(self.frqs), dtype=numpy.bool_)
+		self.time = 0
+
+	@classmethod
+	def range(cls, scanner, start, stop, step, **kw):
+
+		"""Sweep from START to STOP MHz (human) with STEP kHz."""
+
+		return cls(scanner, sweep_frqs(frq_parse(start), frq_parse(stop), step*10.0), **kw)
+
+	@classmethod
+	def bands(cls, scanner, edges, **kw):
+
+		"""Sweep of default bands with their search step and modulation.
+		EDGES is dictionary of band number (1-31) to (lower, upper) MHz,
+		DBC reports only step and modulation, so band edges come from
+		the caller. Default band coverage is read if not yet known."""
+
+		if not scanner.default_band_coverage and not scanner.get_default_band_coverage():
+			raise CommandError('Sweep.bands(): DBC')
+
+		frqs = []
+		mods = []
+		bands = []
+
+		for no in sorted(edges):
+			d = scanner.default_band_coverage[no]
+			lower,upper = edges[no]
+			f = sweep_frqs(frq_parse(lower), frq_parse(upper), step_to_frq(d['step']))
+			frqs.append(f)
+			mods.extend([d['mod']]*len(f))
+			bands.append(numpy.repeat(numpy.int8(no), len(f)))
+
+		s = cls(scanner, numpy.concatenate(frqs), mods, **kw)
+		s.band = numpy.concatenate(bands)
+
+		return s
+
+	def __len__(self):
+
+		return len(self.frqs)
+
+	def sweep(self):
+
+		"""Sweeps all frequencies once. Returns numpy array of RSSI,
+		squelch status is stored to SQL array. Raises CommandError
+		with position in sweep if the scanner refuses command."""
+
+		self.time = time.time()
+		res = self.scanner.raw_pipeline(self.cmds, self.depth)
+
+		# QSC,[RSSI],[FRQ],[SQL]
+		parts = [r.split(',') for r in res]
+		try:
+			self.rssi = numpy.array([p[1] for p in parts], dtype=numpy.int16)
+			self.sql = numpy.array([p[3] == '1' for p in parts], dtype=numpy.bool_)
+
+		except (IndexError, ValueError):
+			raise RecordFormatError('sweep(): bad QSC reply')
+
+		return self.rssi
+
+	def waterfall(self, rows, count=None, interval=0, callback=None):
+
+		"""Repeats sweep COUNT times (forever if None) every INTERVAL
+		seconds into Waterfall of ROWS sweeps. CALLBACK(waterfall) is
+		called after every sweep, returning False stops sweeping.
+		Returns the Waterfall."""
+
+		w = Waterfall(rows, len(self.frqs))
+		n = 0
+
+		while count is None or n < count:
+
+			t = time.time()
+			w.append(self.sweep(), self.time)
+			n += 1
+
+			if callback and callback(w) is False: break
+
+			delay = t+interval-time.time()
+			if delay > 0: time.sleep(delay)
+
+		return w
+
+	def frequencies(self):
+
+		"""Returns human frequencies of sweep points."""
+
+		return frqs_format(self.frqs)
@@ -16,6 +16,10 @@
 
 import yaml
 import time
+from contextlib import contextmanager
+from array import array
+from operator import itemgetter
+from itertools import count
 import serial
 import logging
 from constants import *
@@ -41,26 +45,720 @@ def zero_to_tail(t):
 		
 	return tuple(l)
 
+FRQ_MAX=99999999
+
+# seconds without commands after "COM,OK"
+COM_HOLDOFF=2.0
+
+def frq_parse(f):
+
+	"""Parses human frequency in MHz to integer in scanner units (100 Hz).
+	Accepts strings ('155.475', '155.4750', '460'), ints and floats in MHz.
+	A Frequency instance is returned unchanged."""
+
+	if isinstance(f, Frequency): return int(f)
+	if isinstance(f, float): f=repr(f)
+	elif isinstance(f, (int, long)): f=str(f)
+
+	s=f.strip()
+	if '.' in s: l,r=s.split('.',1)
+	else: l,r=s,''
+
+	if len(r)>4:
+		if r[4:].strip('0'): raise FrequencyError('frq_parse(): %s is finer than 100 Hz' % f)
+		r=r[:4]
+
+	if not (l or r) or not (l+r).isdigit():
+		raise FrequencyError('frq_parse(): bad frequency %s' % f)
+
+	n=int(l or '0')*10000+int(r.ljust(4,'0') or '0')
+	if n>FRQ_MAX: raise FrequencyError('frq_parse(): %s is out of range' % f)
+
+	return n
+
+def frq_format(n):
+
+	"""Formats integer frequency (100 Hz units) to human MHz string, e.g. '155.4750'."""
+
+	return '%d.%04d' % divmod(n,10000)
+
+def frq_decode(f):
+
+	"""Decodes scanner frequency (digits from 1 GHz to 100 Hz) to integer."""
+
+	if isinstance(f, (int, long)): n=int(f)
+	elif not f.isdigit(): raise FrequencyError('frq_decode(): bad frequency %s' % f)
+	else: n=int(f)
+
+	if not 0<=n<=FRQ_MAX: raise FrequencyError('frq_decode(): %s is out of range' % f)
+
+	return n
+
+def frq_encode(n):
+
+	"""Encodes integer frequency to scanner format, 8 digits zero-padded."""
+
+	if not 0<=n<=FRQ_MAX: raise FrequencyError('frq_encode(): %s is out of range' % n)
+
+	return '%08d' % n
+
+def frq_value(f):
+
+	"""Returns integer frequency (100 Hz units) of F. Ints and Frequency
+	instances are 100 Hz units, 8 digits strings are scanner format, other
+	strings are human MHz ('155.475', '460'). For program records and
+	queries, see lockout_frq() for GLF values."""
+
+	if isinstance(f, (int, long)): return frq_decode(int(f))
+	if len(f.strip()) == 8 and f.strip().isdigit(): return frq_decode(f.strip())
+
+	return frq_parse(f)
+
+def frqs_parse(seq):
+
+	"""Batch frq_parse(), returns array of integers."""
+
+	return array('i', [frq_parse(f) for f in seq])
+
+def frqs_decode(seq):
+
+	"""Batch frq_decode(), returns array of integers."""
+
+	return array('i', [frq_decode(f) for f in seq])
+
+def frqs_format(seq):
+
+	"""Batch frq_format(), returns list of human strings."""
+
+	return ['%d.%04d' % divmod(n,10000) for n in seq]
+
+def frqs_encode(seq):
+
+	"""Batch frq_encode(), returns list of scanner strings."""
+
+	return [frq_encode(n) for n in seq]
+
+def frq_range(start, stop, step):
+
+	"""Returns array of integer frequencies from start to stop inclusive.
+	All arguments are integers in 100 Hz units."""
+
+	if step<=0: raise FrequencyError('frq_range(): step must be positive')
+
+	return array('i', xrange(start, stop+1, step))
+
 def frq_to_scanner(f):
 
-	module_logger.debug('frq_to_scanner(): f=%s' % f)
+	"""Converts human frequency in MHz to scanner format. '' and 0 pass as is."""
+
 	if f=='' or f==0: return f
 
-	l,r=str(f).split('.')
-	l=l.rjust(4,'0')
-	r=r.ljust(4,'0')
-	module_logger.debug('frq_to_scanner(): l=%s,r=%s' % (l,r))
-	
-	return ''.join([l,r])
+	return frq_encode(frq_parse(f))
 
 def frq_from_scanner(f):
 
-	f=str(float(f)/10000)
-	l,r=f.split('.')
-	r=r.ljust(4,'0')
+	"""Converts scanner frequency to human MHz string. '' passes as is."""
 
-	return '.'.join([l,r])
-	
+	if f=='': return f
+
+	return frq_format(frq_decode(f))
+
+class Frequency(int):
+
+	"""Exact frequency in scanner units of 100 Hz.
+
+	Frequency.parse('155.475') == 1554750
+	Frequency.from_scanner('01554750').mhz() == '155.4750'
+
+	Arithmetic on Frequency gives plain integers in 100 Hz units."""
+
+	__slots__=()
+
+	def __new__(cls, n=0):
+
+		if not 0<=n<=FRQ_MAX: raise FrequencyError('Frequency(): %s is out of range' % n)
+
+		return int.__new__(cls, n)
+
+	@classmethod
+	def parse(cls, f):
+
+		"""Creates Frequency from human MHz value."""
+
+		return cls(frq_parse(f))
+
+	@classmethod
+	def from_scanner(cls, f):
+
+		"""Creates Frequency from scanner formatted value."""
+
+		return cls(frq_decode(f))
+
+	def mhz(self):
+
+		"""Returns human MHz string."""
+
+		return frq_format(self)
+
+	def scanner(self):
+
+		"""Returns scanner formatted string."""
+
+		return '%08d' % self
+
+	def __str__(self):
+
+		return frq_format(self)
+
+	def __repr__(self):
+
+		return 'Frequency(%s)' % frq_format(self)
+
+def lockout_frq(f):
+
+	"""Normalizes lockout frequency to scanner format (8 digits).
+	Frequency instances, ints and digits only strings are scanner units,
+	as GLF reports them (unpadded), other strings are human MHz ('155.475')."""
+
+	if isinstance(f, (int, long)): return frq_encode(int(f))
+	if f.strip().isdigit(): return frq_encode(frq_decode(f.strip()))
+
+	return frq_encode(frq_parse(f))
+
+class CommandSchema:
+
+	"""Declarative layout of a scanner command record.
+
+	CMD		Command name
+	GET		Field names of the scanner reply after the command name
+	SET		Field names of the set command after the command name,
+			defaults to GET layout. Index parameters are fields too.
+	ENUMS		Field name to human values map (or tuple of valid values)
+
+	None marks a reserved slot. Fields found in SET are read-write,
+	fields found only in GET are read-only.
+	Parse and format functions are compiled once, on creation."""
+
+	def __init__(self, cmd, get=(), set=None, enums={}):
+
+		self.cmd = cmd
+		self.get = tuple(get)
+		if set is None: self.set = self.get
+		else: self.set = tuple(set)
+		self.enums = enums
+
+		self.fields = tuple([f for f in self.get if f])
+		self.read_write = tuple([f for f in self.set if f])
+		self.read_only = tuple([f for f in self.fields if f not in self.read_write])
+		self.size = len(self.get)+1
+
+		self._parse = _fields_getter([i+1 for i,f in enumerate(self.get) if f])
+		self._format = _fields_getter(self.read_write)
+		self._template = ','.join([cmd]+[('%s' if f else '') for f in self.set])
+
+	def parse(self, res):
+
+		"""Parses scanner reply to dictionary of fields."""
+
+		l = res.split(',')
+
+		if len(l) <> self.size or l[0] <> self.cmd:
+			raise RecordFormatError('%s: expected %d fields, got %d: %s' % (self.cmd,self.size,len(l),res))
+
+		return dict(zip(self.fields,self._parse(l)))
+
+	def parse_into(self, obj, res):
+
+		"""Parses scanner reply to object attributes."""
+
+		obj.__dict__.update(self.parse(res))
+
+	def format(self, values):
+
+		"""Formats set command from dictionary of fields."""
+
+		try:
+			return self._template % self._format(values)
+
+		except KeyError, e:
+			raise RecordFormatError('%s: missing field %s' % (self.cmd,str(e)))
+
+	def format_from(self, obj):
+
+		"""Formats set command from object attributes."""
+
+		return self.format(obj.__dict__)
+
+	def query(self, *args):
+
+		"""Formats get command with optional index parameters."""
+
+		return ','.join((self.cmd,)+tuple([str(a) for a in args]))
+
+	def human(self, values):
+
+		"""Returns copy of dictionary with enum fields in human form."""
+
+		d = dict(values)
+
+		for f,enum in self.enums.items():
+			if isinstance(enum, dict) and d.get(f) in enum: d[f] = enum[d[f]]
+
+		return d
+
+	def validate(self, values):
+
+		"""Returns tuple of (field, value) which are out of enum values.
+		Blank values are allowed, as for protected systems."""
+
+		bad = []
+
+		for f,enum in self.enums.items():
+			v = values.get(f, '')
+			if v != '' and str(v) not in enum and v not in enum: bad.append((f,v))
+
+		return tuple(bad)
+
+def _fields_getter(keys):
+
+	"""Returns function getting tuple of items by keys."""
+
+	if not keys: return lambda l: ()
+	if len(keys) == 1:
+		k = keys[0]
+		return lambda l: (l[k],)
+
+	return itemgetter(*keys)
+
+def band_plan_from_fields(d):
+
+	"""Groups lowerN, upperN, stepN and offsetN fields to band plan tuples."""
+
+	return dict([(f, tuple([0]+[d['%s%d' % (f,i)] for i in range(1,7)]))
+			for f in ('lower','upper','step','offset')])
+
+def band_plan_to_fields(bp):
+
+	"""Flattens band plan tuples to lowerN, upperN, stepN and offsetN fields."""
+
+	return dict([('%s%d' % (f,i), bp[f][i]) for i in range(1,7)
+			for f in ('lower','upper','step','offset')])
+
+def _rsv(n):
+
+	return (None,)*n
+
+_mcp_fields = tuple(['%s%d' % (f,i) for i in range(1,7) for f in ('lower','upper','step','offset')])
+_abp_fields = tuple(['%s_%X' % (f,i) for i in range(0,16) for f in ('bf','sf')])
+
+schemas = {}
+
+for _s in (
+
+	# Scanner
+	CommandSchema('MDL', ('model',), ()),
+	CommandSchema('VER', ('version',), ()),
+	CommandSchema('PWR', ('rssi','frq'), ()),
+	CommandSchema('GLG', ('frq_tgid','mod','att','ctcss_dcs','name1','name2','name3',
+			'sql','mute','sys_tag','chan_tag','p25nac'), (),
+		{'att':human_onoff, 'mute':human_onoff}),
+	CommandSchema('QSH', (), ('frq',None,'mod','att','dly',None,'code_srch','bsc','rep',
+			None,'agc_analog','agc_digital','p25waiting'),
+		{'mod':mod_values}),
+	CommandSchema('QSC', ('rssi','frq','sql'), ('frq',None,'mod','att','dly',None,'code_srch',
+			'bsc','rep',None,'agc_analog','agc_digital','p25waiting'),
+		{'mod':mod_values}),
+	CommandSchema('VOL', ('level',)),
+	CommandSchema('SQL', ('level',)),
+	CommandSchema('P25', (None,None,'err_rate')),
+	CommandSchema('BAV', ('ad_value',), ()),
+	CommandSchema('WIN', ('ad_value','frq'), ()),
+	CommandSchema('RMB', ('free',), ()),
+	CommandSchema('MEM', ('memory_used','systems','sites','channels','locations'), ()),
+	CommandSchema('DBC', ('step','mod'), ('band_no',)),
+	CommandSchema('SIH', ('sys_index',), ()),
+	CommandSchema('SIT', ('sys_index',), ()),
+	CommandSchema('QSL', tuple(['page%d' % i for i in range(0,10)])),
+	CommandSchema('CSY', ('sys_index',), ('sys_type','protect')),
+	CommandSchema('AST', ('sit_index',), ('sys_index',None)),
+	CommandSchema('AGC', ('grp_index',), ('sys_index',)),
+	CommandSchema('AGT', ('grp_index',), ('sys_index',)),
+	CommandSchema('ACC', ('chn_index',), ('grp_index',)),
+	CommandSchema('ACT', ('chn_index',), ('grp_index',)),
+	CommandSchema('GLI', ('tgid',), ('sys_index',)),
+	CommandSchema('SLI', ('tgid',), ('sys_index',)),
+	CommandSchema('LOI', (), ('sys_index','tgid')),
+	CommandSchema('ULI', (), ('sys_index','tgid')),
+	CommandSchema('GLF', ('frq',), ()),
+	CommandSchema('LOF', (), ('frq',)),
+	CommandSchema('ULF', (), ('frq',)),
+	CommandSchema('DSY', (), ('sys_index',)),
+	CommandSchema('DGR', (), ('grp_index',)),
+	CommandSchema('DCH', (), ('chn_index',)),
+
+	# Settings
+	CommandSchema('BLT', ('event','color','dimmer'), None,
+		{'event':human_events, 'color':color_values+('OFF',), 'dimmer':human_dimmers}),
+	CommandSchema('BSV', ('bat_save','charge_time'), None,
+		{'bat_save':human_onoff}),
+	CommandSchema('COM', ('baudrate',None), None,
+		{'baudrate':baudrate_values}),
+	CommandSchema('KBP', ('level','lock','safe'), None,
+		{'level':beep_level_values.values(), 'lock':human_onoff, 'safe':human_onoff}),
+	CommandSchema('OMS', ('l1_char','l2_char','l3_char','l4_char')),
+	CommandSchema('PRI', ('pri_mode','max_chan','interval'), None,
+		{'pri_mode':human_pri_modes}),
+	CommandSchema('AGV', _rsv(2)+('a_res','a_ref','a_gain','d_res','d_gain')),
+	CommandSchema('SCT', ('n',), ()),
+	CommandSchema('CNT', ('contrast',)),
+	CommandSchema('SCN', ('disp_mode',None,'ch_log','g_att',None,'p25_lpf','disp_uid')+_rsv(14), None,
+		{'disp_mode':disp_mode_values.values(), 'ch_log':human_ch_logs, 'g_att':human_onoff,
+		'p25_lpf':human_onoff, 'disp_uid':human_onoff}),
+
+	# System
+	CommandSchema('SIN',
+		('sys_type','name','quick_key','hld','lout','dly')+_rsv(5)+('rev_index','fwd_index',
+			'chn_grp_head','chn_grp_tail','seq_no','start_key')+_rsv(5)+('number_tag',
+			'agc_analog','agc_digital','p25waiting','protect',None),
+		('sys_index','name','quick_key','hld','lout','dly')+_rsv(5)+('start_key',)+_rsv(6)+
+			('number_tag','agc_analog','agc_digital','p25waiting'),
+		{'sys_type':human_sys_type, 'lout':human_lout, 'agc_analog':human_onoff,
+		'agc_digital':human_onoff, 'protect':human_onoff}),
+	CommandSchema('TRN',
+		('id_search','s_bit','end_code','afs',None,None,'emg','emgl','fmap','ctm_fmap')+_rsv(10)+
+			('tgid_grp_head','tgid_grp_tail','id_lout_grp_head','id_lout_grp_tail','mot_id',
+			'emg_color','emg_pattern','p25nac','pri_id_scan'),
+		('sys_index','id_search','s_bit','end_code','afs',None,None,'emg','emgl','fmap',
+			'ctm_fmap')+_rsv(10)+('mot_id','emg_color','emg_pattern','p25nac','pri_id_scan'),
+		{'id_search':human_id_search, 's_bit':human_sbit, 'end_code':human_end_code,
+		'afs':human_afs, 'emg':human_alert_tones, 'emgl':human_alert_tlevels,
+		'mot_id':human_mot_id, 'emg_pattern':human_altp, 'pri_id_scan':human_onoff}),
+	CommandSchema('QGL', ('lockout',), ('sys_index','lockout')),
+
+	# Group
+	CommandSchema('GIN',
+		('grp_type','name','quick_key','lout','rev_index','fwd_index','sys_index','chn_head',
+			'chn_tail','seq_no','latitude','longitude','grp_range','gps_enable'),
+		('grp_index','name','quick_key','lout','latitude','longitude','grp_range','gps_enable'),
+		{'lout':human_lout, 'gps_enable':human_onoff}),
+
+	# Site
+	CommandSchema('SIF',
+		(None,'name','quick_key','hld','lout','mod','att','c_ch',None,None,'rev_index',
+			'fwd_index','sys_index','chn_head','chn_tail','seq_no','start_key','latitude',
+			'longitude','sit_range','gps_enable',None,'mot_type','edacs_type','p25waiting',None),
+		('sit_index','name','quick_key','hld','lout','mod','att','c_ch',None,None,'start_key',
+			'latitude','longitude','sit_range','gps_enable',None,'mot_type','edacs_type',
+			'p25waiting',None),
+		{'lout':human_lout, 'att':human_onoff, 'c_ch':human_onoff, 'gps_enable':human_onoff}),
+	CommandSchema('MCP', _mcp_fields, ('sit_index',)+_mcp_fields),
+	CommandSchema('ABP', _abp_fields, ('sit_index',)+_abp_fields),
+
+	# Channel, TGID and Trunk Frequency
+	CommandSchema('CIN',
+		('name','frq','mod','dcs','tlock','lout','pri','att','alt','altl','rev_index',
+			'fwd_index','sys_index','grp_index',None,'audio_type','p25nac','number_tag',
+			'alt_color','alt_pattern','vol_offset'),
+		('chn_index','name','frq','mod','dcs','tlock','lout','pri','att','alt','altl',None,
+			'audio_type','p25nac','number_tag','alt_color','alt_pattern','vol_offset'),
+		{'mod':mod_values, 'dcs':human_ctcss_dcs, 'tlock':human_lout, 'lout':human_lout,
+		'pri':human_onoff, 'att':human_onoff, 'alt':human_alert_tones,
+		'altl':human_alert_tlevels, 'audio_type':human_audiot, 'alt_pattern':human_altp}),
+	CommandSchema('TIN',
+		('name','tgid','lout','pri','alt','altl','rev_index','fwd_index','sys_index',
+			'grp_index',None,'audio_type','number_tag','alt_color','alt_pattern','vol_offset'),
+		('chn_index','name','tgid','lout','pri','alt','altl',None,'audio_type','number_tag',
+			'alt_color','alt_pattern','vol_offset'),
+		{'lout':human_lout, 'pri':human_onoff, 'alt':human_alert_tones,
+		'altl':human_alert_tlevels, 'audio_type':human_audiot, 'alt_pattern':human_altp}),
+	CommandSchema('TFQ',
+		('frq','lcn','lout','rev_index','fwd_index','sys_index','grp_index',None,
+			'number_tag','vol_offset',None),
+		('chn_index','frq','lcn','lout',None,'number_tag','vol_offset',None),
+		{'lout':human_lout}),
+
+	# Search
+	CommandSchema('SCO',
+		(None,'modulation','attenuate','delay',None,'code_srch','bscreen','repeater',None,None,
+			'max_store',None,'agc_analog','agc_digital','p25waiting'), None,
+		{'modulation':mod_values, 'attenuate':human_onoff, 'repeater':human_onoff,
+		'agc_analog':human_onoff, 'agc_digital':human_onoff}),
+	CommandSchema('SHK', ('srch_key_1','srch_key_2','srch_key_3')+_rsv(3)),
+	CommandSchema('CLC',
+		('mode','override',None,'beep','level','pause','band','lockout','hold','quick_key',
+			'number_tag','color','pattern'), None,
+		{'mode':human_cc_modes, 'override':human_onoff, 'beep':human_alert_tones,
+		'level':human_alert_tlevels, 'lockout':human_lout, 'pattern':human_altp}),
+	CommandSchema('CSG', ('n',)),
+	CommandSchema('BSP', ('frequency','step','span','max_hold')),
+	CommandSchema('BBS', ('limit_l','limit_h'), ('index','limit_l','limit_h')),
+	CommandSchema('CBP', ('mot_type',)+_mcp_fields, ('index','mot_type')+_mcp_fields),
+	CommandSchema('CSP',
+		('name','limit_l','limit_h','step','modulation','attenuation','delay',None,'hold',
+			'lockout','cch',None,None,'quick_key','start_key',None,'number_tag','agc_analog',
+			'agc_digital','p25waiting'),
+		('index','name','limit_l','limit_h','step','modulation','attenuation','delay',None,
+			'hold','lockout','cch',None,None,'quick_key','start_key',None,'number_tag',
+			'agc_analog','agc_digital','p25waiting'),
+		{'modulation':mod_values, 'attenuation':human_onoff, 'lockout':human_lout,
+		'cch':human_onoff, 'agc_analog':human_onoff, 'agc_digital':human_onoff}),
+	CommandSchema('SSP',
+		('srch_index','delay','attenuation','hold','lockout','quick_key','start_key',None,
+			'number_tag','agc_analog','agc_digital','p25waiting'), None,
+		{'attenuation':human_onoff, 'lockout':human_lout, 'agc_analog':human_onoff,
+		'agc_digital':human_onoff}),
+	): schemas[_s.cmd] = _s
+
+del _s
+
+# STS,[DSP_FORM],[L1_CHAR],[L1_MODE],...,[Lx_CHAR],[Lx_MODE],[SQL],[MUT],[BAT],[WAT],[RSV],[RSV],[SIG_LVL],[BK_COLOR],[BK_DIMMER]
+STS_LINES=8
+STS_TAIL=('sql','mut','bat','wat','rsv1','rsv2','sig_lvl','bk_color','bk_dimmer')
+
+def sts_parse(res):
+
+	"""Parses STS reply to dictionary, see get_current_status().
+	Line characters and modes are 16 chars fixed length and may contain
+	commas, so they are cut by position when the reply has fixed layout,
+	by commas otherwise. CHAR and MODE are padded with '' to 8 lines."""
+
+	if not res.startswith('STS,'):
+		raise RecordFormatError('STS: bad reply %s' % res)
+
+	l=res[4:].rsplit(',',len(STS_TAIL))
+	if len(l) <> len(STS_TAIL)+1:
+		raise RecordFormatError('STS: expected %d fields: %s' % (len(STS_TAIL),res))
+
+	dsp_form,sep,text=l[0].partition(',')
+	n=len(dsp_form)*2
+
+	if len(text) == n*17-1:
+		cm=[text[i:i+16] for i in xrange(0,len(text),17)]
+	else:
+		cm=text.split(',')
+		if len(cm) <> n:
+			raise RecordFormatError('STS: expected %d lines: %s' % (n/2,res))
+
+	pad=['']*(STS_LINES-n/2)
+
+	d=dict(zip(STS_TAIL,l[1:]))
+	d.update({'dsp_form':dsp_form, 'char':tuple(cm[0::2]+pad), 'mode':tuple(cm[1::2]+pad)})
+
+	return d
+
+def link_record(records, index, owner, head, tail):
+
+	"""Links record INDEX of RECORDS dictionary to the tail of OWNER list.
+	Record rev_index/fwd_index, old tail fwd_index and OWNER HEAD/TAIL
+	attributes are updated as the scanner does on append."""
+
+	r = records[index]
+	last = getattr(owner,tail)
+
+	if last in (None,'-1'): last = '-1'
+
+	r.rev_index = last
+	r.fwd_index = '-1'
+
+	if last in records: records[last].fwd_index = index
+	if getattr(owner,head) in (None,'-1'): setattr(owner,head,index)
+	setattr(owner,tail,index)
+
+	r.modified = True
+	r.notify('append', owner)
+
+def record_state(r, *cmds):
+
+	"""Returns set commands CMDS of record R as its state, None if R is incomplete."""
+
+	try:
+		return tuple([schemas[cmd].format_from(r) for cmd in cmds])
+
+	except RecordFormatError:
+		return None
+
+def mark_modified(r, before):
+
+	"""Marks record R modified if its state differs from BEFORE."""
+
+	if before is None or before <> r.state(): r.modified = True
+
+def index_key(index):
+
+	"""Sort key of record INDEX, scanner indexes in numeric order before
+	placeholders of offline creates ('@1', ...)."""
+
+	if index.isdigit(): return (0, int(index), index)
+	if index[1:].isdigit(): return (1, int(index[1:]), index)
+
+	return (2, 0, index)
+
+def record_pool(records, key):
+
+	"""Returns dictionary of KEY(record) to list of RECORDS indexes, for merge loads."""
+
+	pool = {}
+
+	for i in sorted(records, key=index_key): pool.setdefault(key(records[i]),[]).append(i)
+
+	return pool
+
+def pool_take(pool, records, key, name=None):
+
+	"""Takes index of a record matching KEY from POOL, one with NAME if any.
+	Returns None if nothing matches."""
+
+	l = pool.get(key)
+	if not l: return None
+
+	for i in name is not None and l or []:
+		if records[i].name == name:
+			l.remove(i)
+			return i
+
+	return l.pop(0)
+
+def read_record(r, *args):
+
+	"""Reads record R from the scanner by get_data(ARGS). Returns R, None on error."""
+
+	return r.get_data(*args) and r or None
+
+def walk_records(head, read):
+
+	"""Yields records of scanner linked list from index HEAD, following
+	fwd_index. READ(index) returns record read from the scanner, None on
+	error, which raises CommandError, so a partial list is never taken
+	for the whole."""
+
+	index = head
+
+	while index not in (None,'','-1'):
+		r = read(index)
+		if r is None: raise CommandError('walk_records(): failed to read %s' % index)
+		yield r
+		index = r.fwd_index
+
+# child lists of dump() dictionaries
+dump_children = {'system':('groups','sites'), 'group':('channels','tgids'), 'site':('trunk_frqs',)}
+
+def strip_dump(r):
+
+	"""Returns dump() of record R without child lists."""
+
+	d = r.dump()
+	for k in sum(dump_children.values(), ()): d.pop(k, None)
+
+	return d
+
+def nest_scan_records(docs):
+
+	"""Nests {kind: dictionary} documents of UnidenScanner.export_scan_settings()
+	back to list of System.load() dictionaries."""
+
+	systems = []
+	parent = {}
+
+	for doc in docs:
+		(kind, d), = doc.items()
+		d = dict(d)
+
+		for k in dump_children.get(kind, ()): d[k] = []
+
+		if kind == 'system':
+			systems.append(d)
+		elif kind in ('site','group'):
+			systems[-1][kind+'s'].append(d)
+		elif kind == 'trunk_frq':
+			parent['site']['trunk_frqs'].append(d)
+		else:
+			parent['group'][kind+'s'].append(d)
+
+		parent[kind] = d
+
+	return systems
+
+def unlink_record(records, index, owner, head, tail):
+
+	"""Removes record INDEX from RECORDS dictionary and returns it.
+	Neighbour rev_index/fwd_index and OWNER HEAD/TAIL attributes are
+	updated as the scanner does on delete."""
+
+	r = records.pop(index)
+	rev,fwd = r.rev_index,r.fwd_index
+
+	if rev in records: records[rev].fwd_index = fwd
+	if fwd in records: records[fwd].rev_index = rev
+	if getattr(owner,head) == index: setattr(owner,head,fwd or '-1')
+	if getattr(owner,tail) == index: setattr(owner,tail,rev or '-1')
+
+	r.notify('delete', owner)
+
+	return r
+
+_local_indexes = count(1)
+
+def local_index():
+
+	"""Returns new index of record appended while unbound ('~1', ...),
+	see Record."""
+
+	return '~%d' % _local_indexes.next()
+
+def is_local(index):
+
+	return str(index).startswith('~')
+
+def create_local(scanner, owner, records, head, tail, key, cmd):
+
+	"""Creates local RECORDS of OWNER list (see local_index()) on SCANNER
+	in list order. CMD(record) returns the create command, its reply carries
+	the new index, which replaces KEY attribute and dictionary key of the
+	record. Returns list of created records, raises CommandError."""
+
+	l = []
+	index = getattr(owner,head)
+
+	while index in records:
+		if is_local(index): l.append(index)
+		index = records[index].fwd_index
+
+	for i in l:
+		c = cmd(records[i])
+		res = scanner.raw(c)
+		new = schemas[c.split(',')[0]].parse(res)[key]
+		if new == '-1': raise CommandError('create_local(): no free memory for %s' % c)
+
+		r = unlink_record(records, i, owner, head, tail)
+		setattr(r, key, new)
+		records[new] = r
+		link_record(records, new, owner, head, tail)
+		l[l.index(i)] = r
+
+	return l
+
+def delete_records(scanner, cmd, key, records, indexes, owner, head, tail, depth=8):
+
+	"""Deletes RECORDS by INDEXES with pipelined CMD commands and unlinks them.
+	All records are deleted when INDEXES is None.
+	On error records up to the failed command are unlinked and CommandError
+	is raised, the device state of the rest of the batch is unknown."""
+
+	if indexes is None: indexes = records.keys()
+	indexes = [i for i in indexes if i in records]
+
+	cmds = [schemas[cmd].format({key:i}) for i in indexes]
+
+	try:
+		scanner.raw_pipeline(cmds, depth)
+
+	except CommandError, e:
+		for i in indexes[:e.args[0]]: unlink_record(records, i, owner, head, tail)
+		raise
+
+	for i in indexes: unlink_record(records, i, owner, head, tail)
+
+	return len(indexes)
 
 class UnidenScanner:
 
@@ -75,6 +773,8 @@ class UnidenScanner:
 		self.model=None
 		self.version=None
 		self.isProgramMode=False
+		self.program_depth=0
+		self.program_error=False
 		self.system_index_head=None
 		self.system_index_tail=None
 		self.settings=Settings(self)
@@ -84,6 +784,9 @@ class UnidenScanner:
 		self.free_memory_block=None
 		self.used_memory_block={}
 		self.default_band_coverage = ()
+		self.observers=[]
+		self.holdoff=0
+		self.latency=None
 
 		self.open(port, speed)
 		#self.exit_program_mode()
@@ -109,6 +812,28 @@ class UnidenScanner:
 
 		self.close()
 
+	def add_observer(self, callback):
+
+		"""Adds CALLBACK(event, record, owner) called on program tree changes:
+		'append' and 'delete' of any record, 'update' of channel, TGID and
+		trunk frequency data read from the scanner or loaded."""
+
+		self.observers.append(callback)
+
+	def remove_observer(self, callback):
+
+		self.observers.remove(callback)
+
+	def notify(self, event, record, owner=None):
+
+		"""Calls observers, see add_observer()."""
+
+		for callback in self.observers:
+			try:
+				callback(event, record, owner)
+			except Exception, e:
+				self.logger.error('notify(): %s %s' % (event, str(e)))
+
 
 	def raw(self, cmd):
 
@@ -116,21 +841,174 @@ class UnidenScanner:
 
 		f2='OK'
 
+		self.wait_holdoff()
+
 		self.logger.debug('raw(): cmd %s' % cmd)
 		self.serial.write("".join([cmd,'\r']))
 
 		res = (self.serial.readall()).strip('\r')
 		self.logger.debug('raw(): res %s' % res)
 
+		if self.is_error(res):
+			raise CommandError
+		else:
+			return res
+
+	def measure_latency(self, cmd='MDL', count=10):
+
+		"""Measures median round trip time of CMD in seconds to latency.
+		Returns it, 0 on error."""
+
+		times=[]
+
+		for i in range(count):
+			t=time.time()
+			try:
+				self.raw(cmd)
+			except CommandError:
+				self.logger.error('measure_latency(): %s' % cmd)
+				return 0
+			times.append(time.time()-t)
+
+		times.sort()
+		self.latency=times[len(times)/2]
+
+		return self.latency
+
+	def wait_holdoff(self):
+
+		"""Sleeps until link holdoff after COM is over, see set_baudrate()."""
+
+		if self.holdoff:
+			delay=self.holdoff-time.time()
+			if delay > 0: time.sleep(delay)
+
+	def set_baudrate(self, baudrate, wait=True):
+
+		"""Sets PC Control baud rate (COM) and reconfigures host port.
+		BAUDRATE	OFF,4800,9600,19200,38400,57600,115200
+
+		Nothing is sent when port already runs at BAUDRATE. The scanner
+		takes no command in 2 seconds after "COM,OK", with WAIT readiness
+		is probed after that, see wait_ready(). Without WAIT the call returns
+		at once, poll ready() before the next command."""
+
+		baudrate=str(baudrate).upper()
+
+		if baudrate not in baudrate_values:
+			self.logger.error('set_baudrate(): bad baud rate %s' % baudrate)
+			return 0
+
+		if baudrate == str(self.serial.baudrate): return 1
+
+		cmd=schemas['COM'].format({'baudrate':baudrate})
+
+		try:
+			res = self.raw(cmd)
+
+		except CommandError:
+			self.logger.error('set_baudrate(): %s' % cmd)
+			return 0
+
+		self.holdoff=time.time()+COM_HOLDOFF
+
+		if baudrate == 'OFF':
+			self.holdoff=0
+			return 1
+
+		self.serial.baudrate=int(baudrate)
+
+		if wait: return self.wait_ready()
+
+		return 1
+
+	def ready(self):
+
+		"""Non-blocking readiness check after baud rate change.
+		Returns False during holdoff, then probes scanner with MDL once
+		per call until it answers."""
+
+		if not self.holdoff: return True
+		if time.time() < self.holdoff: return False
+
+		self.serial.flushInput()
+
+		try:
+			self.serial.write('MDL\r')
+			res = self.serial.readall().strip('\r')
+
+		except serial.SerialException:
+			return False
+
+		if not res.startswith('MDL,'): return False
+
+		self.holdoff=0
+
+		return True
+
+	def wait_ready(self, retries=10, interval=0.2):
+
+		"""Waits for holdoff, then probes readiness up to RETRIES times
+		every INTERVAL seconds. Returns 1 when scanner answers."""
+
+		if self.holdoff:
+			delay=self.holdoff-time.time()
+			if delay > 0: time.sleep(delay)
+
+		for i in range(retries):
+			if self.ready(): return 1
+			time.sleep(interval)
+
+		self.logger.error('wait_ready(): no answer at %s baud' % self.serial.baudrate)
+
+		return 0
+
+	def is_error(self, res):
+
+		"""Checks if scanner reply is an error."""
+
 		if res.count(',') == 1: 
 			f2=res.split(',')[1]
 		else:
 			f2=res
-	
-		if f2 in self.err_list:
-			raise CommandError
-		else:
-			return res
+
+		return f2 in self.err_list
+
+	def raw_pipeline(self, cmds, depth=8):
+
+		"""Pipelined wrapper for raw scanner commands.
+		Up to DEPTH commands are written before their replies are read.
+		Returns list of replies in command order.
+		Raises CommandError(position, cmd, res, replies) on the first failed
+		or unanswered command with REPLIES of the commands before it, later
+		commands of the same batch are sent."""
+
+		replies=[]
+
+		self.wait_holdoff()
+
+		for i in range(0,len(cmds),depth):
+
+			batch=cmds[i:i+depth]
+			self.logger.debug('raw_pipeline(): cmds %s' % ';'.join(batch))
+			self.serial.write(''.join([cmd+'\r' for cmd in batch]))
+
+			buf=''
+			while buf.count('\r') < len(batch):
+				chunk=self.serial.read(self.serial.inWaiting() or 1)
+				if not chunk: break
+				buf+=chunk
+
+			res=buf.split('\r')[:len(batch)]
+			self.logger.debug('raw_pipeline(): res %s' % ';'.join(res))
+
+			for j in range(0,len(batch)):
+				if j >= len(res) or self.is_error(res[j]):
+					raise CommandError(i+j, batch[j], j < len(res) and res[j] or '', replies+res[:j])
+
+			replies.extend(res)
+
+		return replies
 
 	def get_model(self):
 
@@ -143,9 +1021,10 @@ class UnidenScanner:
 			self.logger.error('get_model()')
 			return 0
 
-		(cmd,self.model)=res.split(",")
+		self.model=schemas['MDL'].parse(res)['model']
+
+		return 1
 
-			
 	def get_version(self):
 
 		"""Returns Firmware Version."""
@@ -157,7 +1036,9 @@ class UnidenScanner:
 			self.logger.error('get_version()')
 			return 0
 		
-		(cmd,self.version)=res.split(",")
+		self.version=schemas['VER'].parse(res)['version']
+
+		return 1
 
 	def get_rssi_power(self):
 
@@ -176,10 +1057,7 @@ class UnidenScanner:
 			self.logger.error('get_rssi_power()')
 			return 0
 
-		(cmd,rssi,frq)=res.split(",")
-		dict={'rssi':rssi, 'frq':frq}
-
-		return dict
+		return schemas['PWR'].parse(res)
 
 	def get_reception_status(self):
 
@@ -207,15 +1085,7 @@ class UnidenScanner:
 			self.logger.error('get_reception_status()')
 			return 0
 
-		(cmd,frq_tgid,mod,att,ctcss_dcs,name1,name2,name3,
-	 	sql,mut,sys_tag,chan_tag,p25nac)=res.split(",")
-
-		dict={'frq_tgid':frq_tgid, 'mod':mod, 'att':att,
-			'ctcss_dcs':ctcss_dcs, 'name1':name1, 'name2':name2, 
-			'name3':name3, 'sql':sql, 'mute':mut, 'sys_tag':sys_tag,
-			'chan_tag':chan_tag, 'p25nac':p25nac}
-			
-		return dict
+		return schemas['GLG'].parse(res)
 
 	def get_current_status(self):
 
@@ -231,26 +1101,19 @@ class UnidenScanner:
 		BK_COLOR	Backlight Color (OFF,BLUE,RED,MAGENTA,GREEN,CYAN,YELLOW,WHITE)
 		BK_DIMMER	Backlight Dimmer (0:OFF / 1:Low / 2:Middle / 3:High )"""
 
-		dict={}
-
 		try:
 			res = self.raw('STS')
-			
+
 		except CommandError:
 			self.logger.error('get_current_status()')
 			return 0
 
-		l=res.split(",")
-		n=len(l[1])
-
-		cm=l[2:n*2+1]
-		while (len(cm)<17): cm.append('')
-
-		dict={'dsp_form':l[0], 'char': tuple(cm[0::2]), 'mode': tuple(cm[1::2]), 
-			'sql':l[-9], 'mut':l[-8], 'bat':l[-7], 'wat':l[-6], 'rsv1':l[-5],
-			'rsv2':l[-4], 'sig_lvl':l[-3], 'bk_color':l[-2], 'bk_dimmer':l[-1]}
+		try:
+			return sts_parse(res)
 
-		return dict
+		except RecordFormatError, e:
+			self.logger.error('get_current_status(): %s' % str(e))
+			return 0
 
 	def push_key(self, mode, key):
 	
@@ -318,7 +1181,7 @@ class UnidenScanner:
 		Parameter, such as STP, changes the contents of Srch/CloCall option.
 		Note: Even when only [FRQ] parameter is set, this command will work.
 
-		FRQ		Frequency (The right frequency)
+		FRQ		Frequency in MHz (string, number or Frequency)
 		MOD		Modulation (AUTO/AM/FM/NFM/WFM/FMB)
 		ATT		Attenuation (0:OFF / 1:ON)
 		DLY		Delay Time (-10,-5,-2,0,1,2,5,10,30)
@@ -339,10 +1202,7 @@ class UnidenScanner:
 		AGC_DIGITAL	AGC Setting for Digital Audio (0:OFF / 1:ON)
 		P25WAITING	P25 Waiting time (0,100,200,300, .... , 900,1000) ms"""
 
-		rsv=''
-
-		frq=''.join([frq.split('.')[0].rjust(4,'0'),
-			 frq.split('.')[1].ljust(4,'0')])
+		frq=frq_encode(frq_parse(frq))
 
 		if mod not in mod_values:
 			raise ModulationError
@@ -350,8 +1210,7 @@ class UnidenScanner:
 		if (len(bsc)<>16 or len(bsc.replace('0','').replace('1',''))):
 			raise BScreenError
 
-		cmd=",".join(['QSH',frq,rsv,mod,str(att),str(dly),rsv,str(code_srch),bsc,str(rep),
-					rsv,str(agc_analog),str(agc_digital),str(p25waiting)])
+		cmd=schemas['QSH'].format(locals())
 
 		try:
 			res = self.raw(cmd)
@@ -370,10 +1229,7 @@ class UnidenScanner:
 		"""Set current frequency and get reception status.
 		see set_quick_search_hold() for vars value descriptions."""
 
-		rsv=''
-
-		frq=''.join([frq.split('.')[0].rjust(4,'0'),
-			 frq.split('.')[1].ljust(4,'0')])
+		frq=frq_encode(frq_parse(frq))
 
 		if mod not in mod_values:
 			raise ModulationError
@@ -381,8 +1237,7 @@ class UnidenScanner:
 		if (len(bsc)<>16 or len(bsc.replace('0','').replace('1',''))):
 			raise BScreenError
 
-		cmd=",".join(['QSC',frq,rsv,mod,str(att),str(dly),rsv,str(code_srch),bsc,str(rep),
-					rsv,str(agc_analog),str(agc_digital),str(p25waiting)])
+		cmd=schemas['QSC'].format(locals())
 
 		try:
 			res = self.raw(cmd)
@@ -391,9 +1246,9 @@ class UnidenScanner:
 			self.logger.error('set_curfrq_reception_status(): %s' % cmd)
 			return 0
 
-		(cmd,rssi,frq,sql) = res.split(",")
+		d=schemas['QSC'].parse(res)
 
-		return (rssi,frq,sql)
+		return (d['rssi'],d['frq'],d['sql'])
 
 	def get_volume(self):
 
@@ -408,8 +1263,7 @@ class UnidenScanner:
 			self.logger.error('get_volume()')
 			return 0
 
-		(cmd,vol) = res.split(",")
-		return vol
+		return schemas['VOL'].parse(res)['level']
 
 	def set_volume(self, vol):
 
@@ -417,7 +1271,7 @@ class UnidenScanner:
 
 		LEVEL		Volume Level ( 0 - 15 )"""
 
-		cmd=",".join(['VOL',str(vol)])
+		cmd=schemas['VOL'].format({'level':vol})
 
 		try:
 			res = self.raw(cmd)
@@ -441,9 +1295,7 @@ class UnidenScanner:
 			self.logger.error('get_squelch()')
 			return 0
 
-		(cmd,sql) = res.split(",")
-
-		return sql
+		return schemas['SQL'].parse(res)['level']
 
 	def set_squelch(self, sql):
 
@@ -451,7 +1303,7 @@ class UnidenScanner:
 
 		LEVEL	Squelch Level (0:OPEN / 1-14 / 15:CLOSE)"""
 
-		cmd=",".join(['SQL',str(sql)])
+		cmd=schemas['SQL'].format({'level':sql})
 
 		try:
 			res = self.raw(cmd)
@@ -475,9 +1327,7 @@ class UnidenScanner:
 			self.logger.error('get_apco_data_settings()')
 			return 0
 
-		(cmd,rsv1,rsv2,err_rate) = res.split(",")
-
-		return err_rate
+		return schemas['P25'].parse(res)['err_rate']
 
 	def set_apco_data_settings(self, p25):
 
@@ -485,8 +1335,7 @@ class UnidenScanner:
 		
 		ERR_RATE		Error Rate (from 0 to 99)"""
 
-		rsv=''
-		cmd=",".join(['P25',rsv,rsv,str(p25)])
+		cmd=schemas['P25'].format({'err_rate':p25})
 
 		try:
 			res = self.raw(cmd)
@@ -531,7 +1380,7 @@ class UnidenScanner:
 			self.logger.error('get_battery_voltage()')
 			return 0
 
-		(bav,ad_value) = res.split(',')
+		ad_value = schemas['BAV'].parse(res)['ad_value']
 
 		return 3.2*float(ad_value)*2/1023
 
@@ -548,9 +1397,9 @@ class UnidenScanner:
 			self.logger.error('get_window_voltage()')
 			return 0
 
-		(win,ad_value,frq) = res.split(',')
+		d = schemas['WIN'].parse(res)
 
-		return (ad_value,frq)
+		return (d['ad_value'],d['frq'])
 
 	def enter_program_mode(self):
 
@@ -589,6 +1438,48 @@ class UnidenScanner:
 
 		return 1
 
+	def probe_program_mode(self):
+
+		"""Detects actual mode by STS display, "Remote Mode" is shown in Program Mode.
+		Updates isProgramMode. Returns True or False, None on error."""
+
+		d=self.get_current_status()
+		if not d: return None
+
+		self.isProgramMode=bool([c for c in d['char'] if 'REMOTE MODE' in c.upper()])
+
+		return self.isProgramMode
+
+	@contextmanager
+	def program_mode(self, probe=False):
+
+		"""Reentrant Program Mode session:
+
+		with scanner.program_mode():
+			scanner.get_system_settings()
+			scanner.get_scan_settings()
+
+		Program Mode is entered once and exited by the session which entered
+		it, nested sessions and settings methods reuse it. With PROBE the
+		actual mode is detected by probe_program_mode() first.
+		PROGRAM_ERROR is set if Program Mode could not be exited."""
+
+		entered=False
+
+		if not self.program_depth:
+			self.program_error=False
+			if probe: self.probe_program_mode()
+			if not self.isProgramMode: entered=self.enter_program_mode()
+
+		self.program_depth+=1
+
+		try:
+			yield self
+
+		finally:
+			self.program_depth-=1
+			if entered and not self.exit_program_mode(): self.program_error=True
+
 	def get_free_memory_blocks(self):
 
 		"""Returns the number of idle(free) memory block.
@@ -601,7 +1492,7 @@ class UnidenScanner:
 			self.logger.error('get_free_memory_blocks()')
 			return 0
 
-		(rmb,self.free_memory_blocks) = res.split(',')
+		self.free_memory_blocks = schemas['RMB'].parse(res)['free']
 
 		return 1
 
@@ -620,11 +1511,11 @@ class UnidenScanner:
 			self.logger.error('get_used_memory_blocks()')
 			return 0
 
-		(rmb,memory_used,sys,site,chn,loc) = res.split(',')
+		d = schemas['MEM'].parse(res)
 
-		self.used_memory_blocks={'memory used':memory_used,
-			'systems':sys, 'sites':site, 'channels':chn, 
-			'locations':loc}
+		self.used_memory_blocks={'memory used':d['memory_used'],
+			'systems':d['systems'], 'sites':d['sites'], 'channels':d['channels'],
+			'locations':d['locations']}
 
 		return 1
 
@@ -638,78 +1529,212 @@ class UnidenScanner:
 		                        5000 : 50k 10000 : 100k
 		MOD			Modulation (AM / NFM / FM / WFM / FMB)"""
 
-		dfb = [0]
+		dfb = [0]
+
+		for no in range(1,32):
+			try:
+				res = self.raw(schemas['DBC'].query(no))
+
+			except CommandError:
+				self.logger.error('get_default_band_coverage()')
+				return 0
+		
+			dfb.append(schemas['DBC'].parse(res))
+
+		self.default_band_coverage = tuple(dfb)
+
+		return 1
+
+	def device_key(self):
+
+		"""Returns device cache key, model and firmware version."""
+
+		return '%s %s' % (self.model, self.version)
+
+	def dump_device_cache(self):
+
+		"""Returns dictionary of static device data: model, version, band coverage."""
+
+		return {'model':self.model, 'version':self.version,
+			'band_coverage':list(self.default_band_coverage[1:])}
+
+	def load_device_cache(self, d):
+
+		"""Loads dictionary of dump_device_cache() to memory."""
+
+		self.model=d['model']
+		self.version=d['version']
+		self.default_band_coverage=tuple([0]+list(d['band_coverage']))
+
+		return 1
+
+	def connect(self, fname=None):
+
+		"""Reads model and firmware version (MDL, VER), static device data
+		is loaded from YAML cache file FNAME keyed by them. On cache miss,
+		e.g. after firmware update, band coverage is read from the scanner
+		and the cache file is updated. Returns 1 on success."""
+
+		if not self.get_model() or not self.get_version(): return 0
+
+		cache={}
+
+		if fname:
+			try:
+				cache=yaml.load(file(fname, 'r')) or {}
+
+			except IOError:
+				cache={}
+
+		key=self.device_key()
+
+		if key in cache:
+			self.logger.debug('connect(): device cache hit %s' % key)
+			return self.load_device_cache(cache[key])
+
+		if not self.get_default_band_coverage(): return 0
+
+		if fname:
+			cache[key]=self.dump_device_cache()
+			try:
+				f=file(fname, 'w')
+				f.write(yaml.dump(cache))
+				f.close()
+
+			except IOError, e:
+				self.logger.error('connect(): %s' % str(e))
+
+		return 1
+
+	def get_system_settings(self):
+
+		"""Enters program mode and gets scanner settings data."""
+
+		with self.program_mode():
+			self.settings.get_data()
+
+		if self.program_error: return 0
+
+		return 1
+
+	def get_scan_settings(self):
+
+		"""Enters program mode and gets scanner scan settings data recursively.""" 
+
+		with self.program_mode():
+			try:
+				sih = self.raw('SIH')
+				sit = self.raw('SIT')
+
+			except CommandError:
+				self.logger.error('get_scan_settings(): failed to get head/tail.')
+				return 0
+
+			self.system_index_head = schemas['SIH'].parse(sih)['sys_index']
+			self.system_index_tail = schemas['SIT'].parse(sit)['sys_index']
 
-		for no in range(1,32):
 			try:
-				res = self.raw(','.join(['DBC',str(no)]))
+				for s in walk_records(self.system_index_head, lambda i: read_record(System(self,i))):
+					self.systems[s.sys_index]=s
 
 			except CommandError:
-				self.logger.error('get_default_band_coverage()')
+				self.logger.error('get_scan_settings(): failed to get systems.')
 				return 0
-		
-			(dbc,step,mod) = res.split(',')
 
-			dfb.append({'step':step, 'mod':mod})
+			try:
+				res = self.raw('QSL')
 
-		self.default_band_coverage = tuple(dfb)
+			except CommandError:
+				self.logger.error('get_scan_settings(): failed to get quick system lockout list.')
+				return 0
+
+			d = schemas['QSL'].parse(res)
+	
+			l=[tuple(d['page%d' % i]) for i in range(0,10)]
+
+			self.quick_lockout=tuple(map(zero_to_head,l))
+
+		if self.program_error: return 0
 
 		return 1
 
-	def get_system_settings(self):
+	def iter_systems(self, recursive=False, notify=False):
 
-		"""Enters program mode and gets scanner settings data."""
+		"""Yields systems read one at a time in Program Mode, they are not
+		stored to systems. Groups and sites are read if RECURSIVE, see
+		System.iter_groups() and System.iter_sites() to stream them.
+		Program Mode is left when the generator is exhausted or closed.
+		Observers are notified of read records only if NOTIFY.
+		Raises CommandError if a record can not be read, as do the other
+		iter_ methods."""
 
-		if not self.isProgramMode: self.enter_program_mode()
+		with self.program_mode():
+			try:
+				sih = self.raw('SIH')
 
-		self.settings.get_data()
+			except CommandError:
+				self.logger.error('iter_systems(): failed to get head.')
+				raise
 
-		self.exit_program_mode()
+			head = schemas['SIH'].parse(sih)['sys_index']
 
-		return 1
+			for s in walk_records(head, lambda i: read_record(System(self,i), recursive, notify)): yield s
 
-	def get_scan_settings(self):
+	def iter_channels(self):
 
-		"""Enters program mode and gets scanner scan settings data recursively.""" 
+		"""Yields channels of all conventional systems read one at a time."""
 
-		if not self.isProgramMode: self.enter_program_mode()
+		for s in self.iter_systems():
+			for g in s.iter_groups():
+				for c in g.iter_channels(): yield c
 
-		try:
-			sih = self.raw('SIH')
-			sit = self.raw('SIT')
+	def iter_tgids(self):
 
-		except CommandError:
-			self.logger.error('get_scan_settings(): failed to get head/tail.')
-			return 0
+		"""Yields TGIDs of all trunked systems read one at a time."""
 
-		(sih,self.system_index_head) = sih.split(',')
-		(sit,self.system_index_tail) = sit.split(',')
+		for s in self.iter_systems():
+			for g in s.iter_groups():
+				for t in g.iter_tgids(): yield t
 
-		sys_index = self.system_index_head
+	def iter_trunk_frequencies(self):
 
-		while int(sys_index) <> -1:
+		"""Yields trunk frequencies of all sites read one at a time."""
 
-			s=System(self,sys_index)
-			s.get_data()
-			self.systems[sys_index]=s
-			sys_index=s.fwd_index
+		for s in self.iter_systems():
+			for site in s.iter_sites():
+				for t in site.iter_trunk_frequencies(): yield t
 
-		try:
-			res = self.raw('QSL')
+	def iter_scan_records(self):
 
-		except CommandError:
-			self.logger.error('get_scan_settings(): failed to get quick system lockout list.')
-			return 0
+		"""Yields (kind, dictionary) of every program record read one at a
+		time, in tree order: system, its sites each followed by its trunk
+		frequencies, then its groups each followed by its channels or
+		TGIDs. Dictionaries are dump() without child lists, see
+		nest_scan_records()."""
 
-		(qsl,p0,p1,p2,p3,p4,p5,p6,p7,p8,p9) = res.split(',')
-	
-		l=[tuple(p0),tuple(p1),tuple(p2),tuple(p3),
-		   tuple(p4),tuple(p5),tuple(p6),tuple(p7),
-		   tuple(p8),tuple(p9)]
+		for s in self.iter_systems():
+			yield ('system', strip_dump(s))
+			for site in s.iter_sites():
+				yield ('site', strip_dump(site))
+				for t in site.iter_trunk_frequencies(): yield ('trunk_frq', t.dump())
+			for g in s.iter_groups():
+				yield ('group', strip_dump(g))
+				for c in g.iter_channels(): yield ('channel', c.dump())
+				for t in g.iter_tgids(): yield ('tgid', t.dump())
 
-		self.quick_lockout=tuple(map(zero_to_head,l))
+	def export_scan_settings(self, stream):
 
-		if not self.exit_program_mode(): return 0
+		"""Streams scan settings to STREAM as YAML documents, one per record
+		({kind: dictionary}, see iter_scan_records()), in constant memory.
+		Read back with nest_scan_records(yaml.load_all(stream)).
+		Returns 0 if a record can not be read, STREAM is then incomplete."""
+
+		try:
+			yaml.dump_all(({k:d} for k,d in self.iter_scan_records()), stream)
+
+		except CommandError, e:
+			self.logger.error('export_scan_settings(): %s' % str(e))
+			return 0
 
 		return 1
 
@@ -717,24 +1742,22 @@ class UnidenScanner:
 
 		"""Enters program mode and sets scan settigns to scanner recursively."""
 
-		if not self.isProgramMode: self.enter_program_mode()
-
-		l=list(self.quick_lockout)
-		l=(map(zero_to_tail,l))
-		l=[''.join(t) for t in l]
-		pages=','.join(l)
-		cmd=','.join(['QSL',pages])
+		with self.program_mode():
+			l=list(self.quick_lockout)
+			l=(map(zero_to_tail,l))
+			l=[''.join(t) for t in l]
+			cmd=schemas['QSL'].format(dict([('page%d' % i, l[i]) for i in range(0,10)]))
 	
-		try:
-			res = self.raw(cmd)
+			try:
+				res = self.raw(cmd)
 
-		except CommandError:
-			self.logger.error('set_scan_settings(): failed to set quick system lockout list.')
-			return 0
+			except CommandError:
+				self.logger.error('set_scan_settings(): failed to set quick system lockout list.')
+				return 0
 
-		for system in self.systems.values(): system.set_data()
+			for system in self.systems.values(): system.set_data()
 
-		if not self.exit_program_mode(): return 0
+		if self.program_error: return 0
 
 		return 1
 
@@ -794,7 +1817,7 @@ class UnidenScanner:
 
 		"""Creates system instance in scanner memory and returns system index."""
 
-		cmd = ','.join(['CSY',sys_type,str(protect)])
+		cmd = schemas['CSY'].format({'sys_type':sys_type, 'protect':protect})
 
 		try:
 			res = self.raw(cmd)
@@ -803,18 +1826,21 @@ class UnidenScanner:
 			self.logger.error('create_system(): %s' % cmd)
 			return 0
 
-		(csy,sys_index) = res.split(',')
+		sys_index = schemas['CSY'].parse(res)['sys_index']
 		if sys_index == -1: return 0
 		s=System(self,sys_index)
+		s.sys_type=sys_type
 		self.systems[sys_index]=s
+		link_record(self.systems,sys_index,self,'system_index_head','system_index_tail')
 		
 		return sys_index
 
 	def delete_system(self, sys_index):
 
-		"""Deletes system in scanner memory by system index."""
+		"""Deletes system in scanner memory by system index.
+		Groups, sites, channels and TGIDs of the system are deleted by scanner."""
 		
-		cmd = ','.join(['DSY',sys_index])
+		cmd = schemas['DSY'].format({'sys_index':sys_index})
 
 		try:
 			res = self.raw(cmd)
@@ -823,31 +1849,89 @@ class UnidenScanner:
 			self.logger.error('delete_system(): %s' % cmd)
 			return 0
 
-		self.systems.pop(sys_index)
+		unlink_record(self.systems,sys_index,self,'system_index_head','system_index_tail')
 
 		return 1
 
-	def get_search_settings(self):
+	def delete_systems(self, indexes=None, depth=8):
 
-		"""Enters program mode and gets scanner search settings data recursively.""" 
+		"""Deletes systems by list of indexes, all systems if indexes is None.
+		One pipelined DSY command per system. Returns number of deleted systems."""
+
+		try:
+			return delete_records(self,'DSY','sys_index',self.systems,indexes,
+					self,'system_index_head','system_index_tail',depth)
+
+		except CommandError, e:
+			self.logger.error('delete_systems(): %s' % str(e))
+			return 0
 
-		if not self.isProgramMode: self.enter_program_mode()
+	def bind_systems(self, systems):
 
-		self.searches.get_data()
+		"""Binds dictionary of unbound (e.g. unpickled) systems as the scanner
+		program tree, see Record. System list head and tail are taken
+		from system rev_index/fwd_index links."""
 
-		self.exit_program_mode()
+		self.systems = systems
+		self.system_index_head = self.system_index_tail = '-1'
+		unlinked = []
+
+		for i,s in systems.items():
+			s.bind(self)
+			if is_local(i) and s.rev_index is None and s.fwd_index is None:
+				unlinked.append(i)
+				continue
+			if s.rev_index in (None,'-1'): self.system_index_head = i
+			if s.fwd_index in (None,'-1'): self.system_index_tail = i
+
+		# systems created unbound, System(None, local_index()), are appended
+		for i in sorted(unlinked, key=index_key):
+			link_record(systems, i, self, 'system_index_head', 'system_index_tail')
 
 		return 1
 
-	def set_search_settings(self):
+	def sync_systems(self):
+
+		"""Creates systems and records created while unbound (see Record)
+		on the scanner in Program Mode, e.g. after bind_systems(). Their
+		data is set by set_scan_settings(). Returns 1, 0 on error."""
+
+		with self.program_mode():
+			try:
+				create_local(self, self, self.systems, 'system_index_head', 'system_index_tail', 'sys_index',
+					lambda s: schemas['CSY'].format({'sys_type':s.sys_type,
+						'protect':getattr(s, 'protected', s.protect)}))
+
+			except CommandError, e:
+				self.logger.error('sync_systems(): %s' % str(e))
+				return 0
+
+			for i in sorted(self.systems, key=index_key):
+				if not self.systems[i].sync(): return 0
+
+		if self.program_error: return 0
+
+		return 1
+
+	def get_search_settings(self):
 
 		"""Enters program mode and gets scanner search settings data recursively.""" 
 
-		if not self.isProgramMode: self.enter_program_mode()
+		with self.program_mode():
+			self.searches.get_data()
+
+		if self.program_error: return 0
 
-		self.searches.set_data()
+		return 1
+
+	def set_search_settings(self):
+
+		"""Enters program mode and sets scanner search settings data recursively.""" 
 
-		self.exit_program_mode()
+		with self.program_mode():
+			self.searches.set_data()
+
+		if self.program_error: return 0
 
 		return 1
 
@@ -876,13 +1960,140 @@ class UnidenScanner:
 
 class UnidenScannerError(Exception): pass
 
-class CommandError(UnidenScannerError): pass
+class CommandError(UnidenScannerError):
+
+	def __str__(self):
+
+		# replies before the failed pipelined command are not logged
+		if len(self.args) > 3: return str(self.args[:3])
+
+		return UnidenScannerError.__str__(self)
 
 class ModulationError(UnidenScannerError): pass
 
 class BScreenError(UnidenScannerError): pass
 
-class Settings:
+class FrequencyError(UnidenScannerError): pass
+
+class RecordFormatError(UnidenScannerError): pass
+
+class Memo:
+
+	"""Memoized dump().
+
+	Assigning any attribute invalidates the dump, so does get_data().
+	Changes made in place to dictionary or list attributes are not seen,
+	call invalidate() after them. dump() returns shallow copy of the
+	memo, nested values are shared and must not be modified."""
+
+	_version = 0
+	_memo = None
+
+	def __setattr__(self, name, value):
+
+		self.__dict__[name] = value
+		if name not in ('_memo','modified'): self.__dict__['_version'] = self._version+1
+
+	def invalidate(self):
+
+		self.__dict__['_version'] = self._version+1
+
+	def memo_parts(self):
+
+		"""Returns list of memoized dumps the dump is made of."""
+
+		return []
+
+	def memo_dump(self):
+
+		"""Returns memoized dump, recomputed if the object or any of
+		memo_parts() changed."""
+
+		parts = self.memo_parts()
+		m = self._memo
+
+		if m and m[0] == self._version and len(m[1]) == len(parts):
+			for a,b in zip(m[1], parts):
+				if a is not b: break
+			else:
+				return m[2]
+
+		d = self._dump()
+		self._memo = (self._version, parts, d)
+
+		return d
+
+	def dump(self):
+
+		"""Returns dump dictionary, see Memo."""
+
+		return dict(self.memo_dump())
+
+class Record(Memo):
+
+	"""Base of program tree records: System, Group, Site, Channel,
+	TrunkFrequency and TalkGroupID.
+
+	Records pickle as plain data, scanner and logger are dropped and
+	restored unbound. Unbound records can be loaded, dumped, merged and
+	compared, e.g. in worker processes; bind() them to a scanner (or
+	OfflineScanner) to get or set data. See UnidenScanner.bind_systems().
+	Records appended while unbound get local indexes (see local_index()),
+	sync() creates them on the scanner after bind()."""
+
+	def __getstate__(self):
+
+		d = dict(self.__dict__)
+		d.pop('scanner', None)
+		d.pop('logger', None)
+		d.pop('_memo', None)
+
+		return d
+
+	def __setstate__(self, d):
+
+		self.__dict__.update(d)
+		self.scanner = None
+		self.logger = logging.getLogger('uniden_api.%s' % self.__class__.__name__)
+
+	def children(self):
+
+		"""Returns list of child records."""
+
+		l = []
+
+		for attr in ('groups','sites','channels','tgids','trunk_frqs'):
+			l.extend(getattr(self, attr, {}).values())
+
+		return l
+
+	def memo_parts(self):
+
+		return [r.memo_dump() for r in self.children()]
+
+	def bind(self, scanner):
+
+		"""Binds record and its subtree to SCANNER. Returns record."""
+
+		self.scanner = scanner
+
+		for r in self.children(): r.bind(scanner)
+
+		return self
+
+	def detach(self):
+
+		"""Unbinds record and its subtree from scanner. Returns record."""
+
+		return self.bind(None)
+
+	def notify(self, event, owner=None):
+
+		"""Reports change of the record to scanner observers, if bound."""
+
+		if self.scanner is not None: self.scanner.notify(event, self, owner)
+
+class Settings(Memo):
 
 	"""Scanner Settings class."""
 
@@ -950,62 +2161,37 @@ class Settings:
 			self.logger.error('get_data()')
 			return 0
 
-		(blt,event,color,dimmer) = blt.split(',')
-		self.backlight = {'event':event, 'color':color, 
-							'dimmer':dimmer}
-		(bsv,bat_save,charge_time) = bsv.split(',')
-		self.battery_info = {'bat_save':bat_save, 
-						'charge_time':charge_time}
-		(com,baudrate,csv) = com.split(',')
-		self.com_port = {'baudrate':baudrate}
-		(kbp,level,lock,safe) = kbp.split(',')
-		self.key_beep = {'level':level, 'lock':lock, 'safe':safe}
-		(oms,l1_char,l2_char,l3_char,l4_char) = oms.split(',')
-		self.opening_message = [0, l1_char, l2_char, l3_char, l4_char]
-		(pri,pri_mode,max_chan,interval) = pri.split(',')
-		self.priority_mode = {'pri_mode':pri_mode, 'max_chan':max_chan, 
-								'interval':interval}
-		(agv,rsv1,rsv2,a_res,a_ref,a_gain,d_res,d_gain) = agv.split(',')
-		self.auto_gain_control={'a_res':a_res, 'a_ref':a_ref, 'a_gain':a_gain,
-								'd_res':d_res, 'd_gain':d_gain}
-		(sct,n) = sct.split(',')
-		self.system_count={'n':n}
-		(cnt,contrast) = cnt.split(',')
-		self.lcd_contrast={'contrast':contrast}
-		(scn,disp_mode,rsv1,ch_log,g_att,rsv2,p25_lpf,disp_uid,rsv3,rsv4,rsv5,
-			rsv6,rsv7,rsv8,rsv9,rsv10,rsv11,rsv12,rsv13,rsv14,rsv15,rsv16) = scn.split(',')
-		self.scanner_option={'disp_mode':disp_mode, 'ch_log':ch_log, 
-						'g_att':g_att, 'p25_lpf':p25_lpf, 'disp_uid':disp_uid}
+		self.backlight = schemas['BLT'].parse(blt)
+		self.battery_info = schemas['BSV'].parse(bsv)
+		self.com_port = schemas['COM'].parse(com)
+		self.key_beep = schemas['KBP'].parse(kbp)
+		oms = schemas['OMS'].parse(oms)
+		self.opening_message = [0, oms['l1_char'], oms['l2_char'], oms['l3_char'], oms['l4_char']]
+		self.priority_mode = schemas['PRI'].parse(pri)
+		self.auto_gain_control = schemas['AGV'].parse(agv)
+		self.system_count = schemas['SCT'].parse(sct)
+		self.lcd_contrast = schemas['CNT'].parse(cnt)
+		self.scanner_option = schemas['SCN'].parse(scn)
 
 		return 1
 
-	def set_data(self):
+	def set_data(self, wait=True):
 
-		"""Set scanner settings data to device."""
-
-		rsv = ''
-		if self.backlight: blt = ','.join(['BLT',str(self.backlight['event']),self.backlight['color'],
-				str(self.backlight['dimmer'])])
-		if self.battery_info: bsv = ','.join(['BSV',str(self.battery_info['bat_save']), 
-				str(self.battery_info['charge_time'])])
-		if self.com_port: com = ','.join(['COM',self.com_port['baudrate'],rsv])
-		if self.key_beep: kbp = ','.join(['KBP',str(self.key_beep['level']),str(self.key_beep['lock']),
-						str(self.key_beep['safe'])])
-		if self.opening_message: oms = ','.join(['OMS',self.opening_message[1],self.opening_message[2],
-						self.opening_message[3],self.opening_message[4]])
-		if self.priority_mode: pri = ','.join(['PRI',str(self.priority_mode['pri_mode']), 
-						str(self.priority_mode['max_chan']),
-						str(self.priority_mode['interval'])])
-		if self.auto_gain_control: agv = ','.join(['AGV',rsv,rsv,str(self.auto_gain_control['a_res']),
-							str(self.auto_gain_control['a_ref']),
-							str(self.auto_gain_control['a_gain']),
-							str(self.auto_gain_control['d_res']),
-							str(self.auto_gain_control['d_gain'])])
-		if self.lcd_contrast: cnt = ','.join(['CNT', str(self.lcd_contrast['contrast'])])
-		if self.scanner_option: scn = ','.join(['SCN', str(self.scanner_option['disp_mode']),rsv,
-				str(self.scanner_option['ch_log']),str(self.scanner_option['g_att']),
-				rsv,str(self.scanner_option['p25_lpf']),str(self.scanner_option['disp_uid']),
-				rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv])
+		"""Set scanner settings data to device.
+		COM port is set last and only if changed, see UnidenScanner.set_baudrate()
+		for WAIT."""
+
+		if self.backlight: blt = schemas['BLT'].format(self.backlight)
+		if self.battery_info: bsv = schemas['BSV'].format(self.battery_info)
+		if self.key_beep: kbp = schemas['KBP'].format(self.key_beep)
+		if self.opening_message:
+			om = self.opening_message
+			oms = schemas['OMS'].format({'l1_char':om[1], 'l2_char':om[2],
+							'l3_char':om[3], 'l4_char':om[4]})
+		if self.priority_mode: pri = schemas['PRI'].format(self.priority_mode)
+		if self.auto_gain_control: agv = schemas['AGV'].format(self.auto_gain_control)
+		if self.lcd_contrast: cnt = schemas['CNT'].format(self.lcd_contrast)
+		if self.scanner_option: scn = schemas['SCN'].format(self.scanner_option)
 
 		try:
 			if self.backlight: blt = self.scanner.raw(blt)
@@ -1016,35 +2202,34 @@ class Settings:
 			if self.auto_gain_control: agv = self.scanner.raw(agv)
 			if self.lcd_contrast: cnt = self.scanner.raw(cnt)
 			if self.scanner_option: scn = self.scanner.raw(scn)
-			if self.com_port: 
-				com = self.scanner.raw(com)
-				time.sleep(3)
 
 		except CommandError, e:
 			self.logger.error('set_data(): %s' % str(e))
 			return 0
 
+		if self.com_port: return self.scanner.set_baudrate(self.com_port['baudrate'], wait)
+
 		return 1
 
-	def dump(self):
+	def _dump(self):
 
 		"""Dump scanner settings to dictionary."""
 
-		bl=self.backlight
+		bl=dict(self.backlight)
 		bl['event']=human_events[bl['event']]
 		bl['dimmer']=human_dimmers[bl['dimmer']]
-		bi=self.battery_info
+		bi=dict(self.battery_info)
 		bi['bat_save']=human_onoff[bi['bat_save']]
-		cp=self.com_port
-		kb=self.key_beep
+		cp=dict(self.com_port)
+		kb=dict(self.key_beep)
 		kb['lock']=human_onoff[kb['lock']]
 		kb['safe']=human_onoff[kb['safe']]
-		om=self.opening_message
-		pm=self.priority_mode
+		om=list(self.opening_message)
+		pm=dict(self.priority_mode)
 		pm['pri_mode']=human_pri_modes[pm['pri_mode']]
-		agc=self.auto_gain_control
-		lc=self.lcd_contrast
-		so=self.scanner_option
+		agc=dict(self.auto_gain_control)
+		lc=dict(self.lcd_contrast)
+		so=dict(self.scanner_option)
 		so['ch_log']=human_ch_logs[so['ch_log']]
 		so['disp_uid']=human_onoff[so['disp_uid']]
 		so['g_att']=human_onoff[so['g_att']]
@@ -1090,7 +2275,7 @@ class Settings:
 
 		return 1
 
-class System:
+class System(Record):
 
 	"""Scanner System class."""
 
@@ -1099,6 +2284,7 @@ class System:
 		self.logger = logging.getLogger('uniden_api.System')
 
 		self.scanner = scanner
+		self.modified=False
 		self.sys_index = sys_index
                 self.sys_type = 'CNV'
                 self.name = 'NONAME'
@@ -1144,9 +2330,10 @@ class System:
 		self.lout_tgids=()
 		self.srch_lout_tgids=()
 
-	def get_data(self):
+	def get_data(self, recursive=True, notify=True):
 
-		"""Get System Information.
+		"""Get System Information, with groups and sites if RECURSIVE,
+		observers are notified of their records if NOTIFY.
 		When the system protect bit is ON, except [SYS_TYPE], [NAME], [REV_INDEX],
 		[FWD_INDEX], [CHN_GRP_HEAD], [CHN_GRP_TAIL], other parameters will be send as a
 		reserve parameter in the Radio -> Controller command.
@@ -1214,7 +2401,7 @@ class System:
 		1 On (Displayed as each number on the scanner.)
 		2 Off (Displayed as “*” on the scanner.)"""
 
-		cmd = ','.join(['SIN',self.sys_index])
+		cmd = schemas['SIN'].query(self.sys_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -1223,30 +2410,12 @@ class System:
 			self.logger.error('get_data(): cmd %s' % cmd)
 			return 0
 
-		(sin,self.sys_type,self.name,self.quick_key,self.hld,self.lout,
-			self.dly,rsv1,rsv2,rsv3,rsv4,rsv5,self.rev_index,self.fwd_index,
-			self.chn_grp_head,self.chn_grp_tail,self.seq_no,self.start_key,
-			rsv6,rsv7,rsv8,rsv9,rsv10,self.number_tag,self.agc_analog,
-			self.agc_digital,self.p25waiting,self.protect,rsv11) = res.split(',')
-
-		grp_index = self.chn_grp_head
-
-		while int(grp_index) <> -1:
-
-			if self.sys_type == 'CNV':
-				g=Group(self.scanner,grp_index,self.sys_type)
-				g.get_data()
-				self.groups[grp_index]=g
-				grp_index=g.fwd_index
-			else:
-				s=Site(self.scanner,grp_index)
-				s.get_data()
-				self.sites[grp_index]=s
-				grp_index=s.fwd_index
+		schemas['SIN'].parse_into(self, res)
+		self.invalidate()
 
 		if self.sys_type <> 'CNV':
 
-			cmd = ','.join(['TRN',self.sys_index])
+			cmd = schemas['TRN'].query(self.sys_index)
 
         	        try:
 				res = self.scanner.raw(cmd)
@@ -1255,23 +2424,19 @@ class System:
 				self.logger.error('get_data(): cmd %s' % cmd)
 				return 0
 
-			(trn,self.id_search,self.s_bit,self.end_code,self.afs,rsv1,rsv2,
-				self.emg,self.emgl,self.fmap,self.ctm_fmap,rsv3,rsv4,rsv5,
-				rsv6,rsv7,rsv8,rsv9,rsv10,rsv11,rsv12,self.tgid_grp_head,
-				self.tgid_grp_tail,self.id_lout_grp_head,self.id_lout_grp_tail,
-				self.mot_id,self.emg_color,self.emg_pattern,self.p25nac,
-				self.pri_id_scan) = res.split(',')
-			
-			tgid_grp_index = self.tgid_grp_head
+			schemas['TRN'].parse_into(self, res)
+			self.invalidate()
 
-			while int(tgid_grp_index) <> -1:
+		if recursive:
+			try:
+				for s in self.iter_sites(True, notify): self.sites[s.sit_index]=s
+				for g in self.iter_groups(True, notify): self.groups[g.grp_index]=g
 
-				g=Group(self.scanner,tgid_grp_index,self.sys_type)
-				g.get_data()
-				self.groups[tgid_grp_index]=g
-				tgid_grp_index=g.fwd_index
+			except CommandError, e:
+				self.logger.error('get_data(): %s' % str(e))
+				return 0
 
-		cmd = ','.join(['QGL',self.sys_index])
+		cmd = schemas['QGL'].query(self.sys_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -1280,64 +2445,87 @@ class System:
 			self.logger.error('get_data(): cmd %s' % cmd)
 			return 0
 		
-		(qgl,s) = res.split(',')
+		s = schemas['QGL'].parse(res)['lockout']
 		self.quick_lockout=zero_to_head(tuple(s))
 
 		self.get_lockout_tgids()
 
 		return 1
 
-	def set_data(self):
+	def iter_groups(self, recursive=False, notify=False):
+
+		"""Yields groups read one at a time, they are not stored to groups.
+		Channels or TGIDs of the groups are read if RECURSIVE, see
+		Group.iter_channels() and Group.iter_tgids() to stream them.
+		Observers are notified of read records only if NOTIFY."""
+
+		head = self.sys_type == 'CNV' and self.chn_grp_head or self.tgid_grp_head
+
+		return walk_records(head, lambda i: read_record(Group(self.scanner,i,self.sys_type), recursive, notify))
+
+	def iter_sites(self, recursive=False, notify=False):
+
+		"""Yields sites of trunked system read one at a time, they are not
+		stored to sites. Trunk frequencies are read if RECURSIVE.
+		Observers are notified of read records only if NOTIFY."""
 
-                """Set scanner system data to device."""
+		if self.sys_type == 'CNV': return iter(())
+
+		return walk_records(self.chn_grp_head, lambda i: read_record(Site(self.scanner,i), recursive, notify))
+
+	def state(self):
+
+		"""Returns state compared by merge loads, see mark_modified()."""
+
+		cmds = self.sys_type <> 'CNV' and ('SIN','TRN') or ('SIN',)
+		state = record_state(self, *cmds)
+
+		return state and state+(tuple(self.quick_lockout),)
+
+	def set_data(self, modified_only=False):
+
+                """Set scanner system data to device.
+		MODIFIED_ONLY	Set only records modified since read or set, see load()"""
 
-		rsv = ''
 		res = ''
-		cmd = ','.join(['SIN',str(self.sys_index),self.name,str(self.quick_key),
-				str(self.hld),str(self.lout),str(self.dly),rsv,rsv,
-				rsv,rsv,rsv,str(self.start_key),rsv,rsv,rsv,rsv,rsv,
-				rsv,str(self.number_tag),str(self.agc_analog),
-				str(self.agc_digital),str(self.p25waiting)])
+		cmd = schemas['SIN'].format_from(self)
+		own = not modified_only or self.modified
 
                 try:
-			res = self.scanner.raw(cmd)
+			if own: res = self.scanner.raw(cmd)
 
 		except CommandError:
 			self.logger.error('set_data(): cmd %s' % cmd)
 			return 0
 
-		for g in self.groups.values(): g.set_data()
+		for g in self.groups.values(): g.set_data(modified_only)
 
 		if self.sys_type <> 'CNV':
 
-			rsv = ''
-			cmd = ','.join(['TRN',str(self.sys_index),str(self.id_search),
-					str(self.s_bit),str(self.end_code),str(self.afs),
-					rsv,rsv,str(self.emg),str(self.emgl),str(self.fmap),
-					self.ctm_fmap,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,rsv,
-					str(self.mot_id),self.emg_color,str(self.emg_pattern),
-					self.p25nac,str(self.pri_id_scan)])
+			cmd = schemas['TRN'].format_from(self)
 
         	        try:
-				res = self.scanner.raw(cmd)
+				if own: res = self.scanner.raw(cmd)
 
 			except CommandError:
 				self.logger.error('set_data(): cmd %s' % cmd)
 				return 0
 
-			for s in self.sites.values(): s.set_data() 
+			for s in self.sites.values(): s.set_data(modified_only)
 
 		t=zero_to_tail(self.quick_lockout)
 		s=''.join(t)
-		cmd = ','.join(['QGL',self.sys_index,s])
+		cmd = schemas['QGL'].format({'sys_index':self.sys_index, 'lockout':s})
 
                 try:
-			res = self.scanner.raw(cmd)
+			if own: res = self.scanner.raw(cmd)
 
 		except CommandError:
 			self.logger.error('set_data(): cmd %s' % cmd)
 			return 0
 
+		self.modified=False
+
 		return 1
 
 	def show(self):
@@ -1394,7 +2582,7 @@ class System:
 		for i in sorted(self.sites): self.sites[i].show_brief()
 
 
-	def dump(self):
+	def _dump(self):
 
 		"""Dumps system data to dictionary."""
 
@@ -1456,9 +2644,15 @@ class System:
 			protected='off', id_mode='scan', status='ignore', end_code='ignore', 
 			edacs_format='decimal', alert='0', alert_lvl='auto', grp_lockout=[], 
 			fleet_map='0', custom_fmap='', id_format='decimal', alert_color='off', pattern='on',
-			nac='', priority='off', groups=[], sites=[], tgids_lockout=[], search_lockout=[]):
+			nac='', priority='off', groups=[], sites=[], tgids_lockout=[], search_lockout=[], merge=False):
 
-		"""Loads dictionary to system class."""
+		"""Loads dictionary to system class.
+		MERGE	Update groups matched by type and name and sites matched
+			by name in place, append the others. Existing records
+			not in the dictionary are kept. Changed records are
+			marked modified, see set_data()"""
+
+		before=self.state()
 
                 self.name = name
                 self.quick_key = str(quick_key)
@@ -1494,20 +2688,27 @@ class System:
 			self.logger.error('load(): keyerror %s' % str(e))
 			return 0
 
+		mark_modified(self, before)
+
+		gpool = merge and record_pool(self.groups, lambda g: (g.grp_type, g.name)) or {}
+		spool = merge and record_pool(self.sites, lambda s: s.name) or {}
+
 		for grp in groups:
-			# append grp
-			i=self.append_group(grp['type'])
+			# existing group of this type and name, or append one
+			i=pool_take(gpool, self.groups, (grp.get('type','C').upper(), grp.get('name','NONAME')))
+			if i is None: i=self.append_group(grp['type'])
 			if i==0: continue
 			# load dict for grp
-			self.groups[i].load(**grp)
+			self.groups[i].load(merge=merge, **grp)
 			# set data ? up to this time data not in scanner!
 
 		for site in sites:
-			# append site
-			i=self.append_site()
+			# existing site of this name, or append one
+			i=pool_take(spool, self.sites, site.get('name','NONAME'))
+			if i is None: i=self.append_site()
 			if i==0: continue
 			# load dict for site
-			self.sites[i].load(**site)
+			self.sites[i].load(merge=merge, **site)
 			# set data ? up to this time data not in scanner!
 			
 		return 1
@@ -1516,27 +2717,33 @@ class System:
 
 		"""Appends site to system. Returns site index."""
 
-		cmd = ','.join(['AST',self.sys_index,''])
+		if self.scanner is None: site_index = local_index()
+		else:
+			cmd = schemas['AST'].format({'sys_index':self.sys_index})
+
+			try:
+				res = self.scanner.raw(cmd)
 
-		try:
-			res = self.scanner.raw(cmd)
+			except CommandError:
+				self.logger.error('append_site(): cmd %s' % cmd)
+				return 0
 
-		except CommandError:
-			self.logger.error('append_site(): cmd %s' % cmd)
-			return 0
+			site_index = schemas['AST'].parse(res)['sit_index']
+			if site_index == -1: return 0
 
-		(ast,site_index) = res.split(',')
-		if site_index == -1: return 0
 		s=Site(self.scanner,site_index)
+		s.sys_index=self.sys_index
 		self.sites[site_index]=s
+		link_record(self.sites,site_index,self,'chn_grp_head','chn_grp_tail')
 
 		return site_index
 
 	def delete_site(self, site_index):
 
-		"""Deletes site from system by index."""
+		"""Deletes site from system by index.
+		Trunk frequencies of the site are deleted by scanner."""
 
-		cmd = ','.join(['DGR',str(site_index)])
+		cmd = schemas['DGR'].format({'grp_index':site_index})
 
 		try:
 			res = self.scanner.raw(cmd)
@@ -1545,38 +2752,99 @@ class System:
 			self.logger.error('delete_site(): cmd %s' % cmd)
 			return 0
 
-		self.sites.pop(site_index)
+		unlink_record(self.sites,site_index,self,'chn_grp_head','chn_grp_tail')
 
 		return 1
 
+	def delete_sites(self, indexes=None, depth=8):
+
+		"""Deletes sites by list of indexes, all sites if indexes is None.
+		One pipelined DGR command per site. Returns number of deleted sites."""
+
+		try:
+			return delete_records(self.scanner,'DGR','grp_index',self.sites,indexes,
+					self,'chn_grp_head','chn_grp_tail',depth)
+
+		except CommandError, e:
+			self.logger.error('delete_sites(): %s' % str(e))
+			return 0
+
 	def append_group(self, gtype='C'):
 
 		"""Appends group to system. Returns group index."""
 
-		cmd=''
+		if self.scanner is None: grp_index = local_index()
+		else:
+			cmd = self.group_create(gtype)
 
-		if gtype == 'C': cmd = ','.join(['AGC',self.sys_index])
-		if gtype == 'T': cmd = ','.join(['AGT',self.sys_index])
+			try:
+				res = self.scanner.raw(cmd)
 
-		try:
-			res = self.scanner.raw(cmd)
+			except CommandError:
+				self.logger.error('append_group(): cmd %s' % cmd)
+				return 0
 
-		except CommandError:
-			self.logger.error('append_group(): cmd %s' % cmd)
-			return 0
+			grp_index = schemas[cmd[:3]].parse(res)['grp_index']
+			if grp_index == -1: return 0
 
-		(ag,grp_index) = res.split(',')
-		if grp_index == -1: return 0
 		g=Group(self.scanner,grp_index,self.sys_type)
+		g.grp_type=gtype
+		g.sys_index=self.sys_index
 		self.groups[grp_index]=g
+		link_record(self.groups,grp_index,self,*self.group_list())
 
 		return grp_index
 
+	def group_create(self, gtype):
+
+		"""Returns command creating group of GTYPE (C or T)."""
+
+		if gtype == 'T': return schemas['AGT'].format({'sys_index':self.sys_index})
+
+		return schemas['AGC'].format({'sys_index':self.sys_index})
+
+	def sync(self):
+
+		"""Creates local sites and groups (see local_index()) and their
+		records on the scanner, in list order. Returns 1, 0 on error."""
+
+		if is_local(self.sys_index):
+			self.logger.error('sync(): system %s is not created, see UnidenScanner.sync_systems()' % self.sys_index)
+			return 0
+
+		for r in self.children(): r.sys_index = self.sys_index
+
+		try:
+			if self.sys_type <> 'CNV':
+				create_local(self.scanner, self, self.sites, 'chn_grp_head', 'chn_grp_tail', 'sit_index',
+					lambda r: schemas['AST'].format({'sys_index':self.sys_index}))
+
+			create_local(self.scanner, self, self.groups, self.group_list()[0], self.group_list()[1], 'grp_index',
+				lambda r: self.group_create(r.grp_type))
+
+		except CommandError, e:
+			self.logger.error('sync(): %s' % str(e))
+			return 0
+
+		for r in self.children():
+			if not r.sync(): return 0
+
+		return 1
+
+	def group_list(self):
+
+		"""Returns names of head and tail attributes of the group list."""
+
+		if self.sys_type == 'CNV': return ('chn_grp_head','chn_grp_tail')
+
+		return ('tgid_grp_head','tgid_grp_tail')
+
 	def delete_group(self, grp_index):
 
-		"""Deletes group from system."""
+		"""Deletes group from system.
+		Channels or TGIDs of the group are deleted by scanner."""
 
-		cmd = ','.join(['DGR',str(grp_index)])
+		cmd = schemas['DGR'].format({'grp_index':grp_index})
 
 		try:
 			res = self.scanner.raw(cmd)
@@ -1585,87 +2853,176 @@ class System:
 			self.logger.error('delete_group(): cmd %s' % cmd)
 			return 0
 
-		self.groups.pop(grp_index)
+		unlink_record(self.groups,grp_index,self,*self.group_list())
+
+		return 1
+
+	def delete_groups(self, indexes=None, depth=8):
+
+		"""Deletes groups by list of indexes, all groups if indexes is None.
+		One pipelined DGR command per group. Returns number of deleted groups."""
+
+		head,tail = self.group_list()
+
+		try:
+			return delete_records(self.scanner,'DGR','grp_index',self.groups,indexes,
+					self,head,tail,depth)
+
+		except CommandError, e:
+			self.logger.error('delete_groups(): %s' % str(e))
+			return 0
+
+	def clear(self, depth=8):
+
+		"""Deletes all groups and sites of the system, the system itself is kept.
+		One DGR command per group or site. Returns 1 on success."""
+
+		n = len(self.groups)+len(self.sites)
+
+		if self.delete_groups(None,depth)+self.delete_sites(None,depth) <> n: return 0
 
 		return 1
 
+	def clear_group(self, grp_index):
+
+		"""Deletes all channels or TGIDs of the group with three commands:
+		DGR, AGC/AGT and GIN with the group settings.
+		The group gets new index and moves to the end of the group list.
+		Returns new group index."""
+
+		g = self.groups[grp_index]
+
+		if not self.delete_group(grp_index): return 0
+
+		i = self.append_group(g.grp_type)
+		if i == 0: return 0
+
+		g.grp_index = i
+		g.rev_index,g.fwd_index = self.groups[i].rev_index,self.groups[i].fwd_index
+		g.chn_head = g.chn_tail = '-1'
+		g.channels = {}
+		g.tgids = {}
+		self.groups[i].notify('delete', self)
+		self.groups[i] = g
+		g.notify('append', self)
+
+		if not g.set_data(): return 0
+
+		return i
+
 	def get_lockout_tgids(self):
 
-		"""Returns tuple of locked out TGIDs and SRCH TGIDs."""
+		"""Reads locked out TGIDs and SRCH TGIDs to lout_tgids and srch_lout_tgids
+		tuples, without the "-1" list terminator."""
 
-		cmd = ','.join(['GLI',self.sys_index])
+		for lst,attr in (('GLI','lout_tgids'),('SLI','srch_lout_tgids')):
 
-		tgid=0
-		l=[]		
+			cmd = schemas[lst].query(self.sys_index)
 
-                try:
-			while int(tgid) <> -1:
-				res = self.scanner.raw(cmd)
-				(gli,tgid) = res.split(',')
-				l.append(tgid)
+			l=[]
 
-		except CommandError:
-			self.logger.error('get_lockout_tgids(): cmd %s' % cmd)
-			return 0
+			try:
+				while True:
+					res = self.scanner.raw(cmd)
+					tgid = schemas[lst].parse(res)['tgid']
+					if tgid == '-1': break
+					l.append(tgid)
 
-		self.lout_tgids=tuple(l)
-		
-		cmd = ','.join(['SLI',self.sys_index])
+			except CommandError:
+				self.logger.error('get_lockout_tgids(): cmd %s' % cmd)
+				return 0
 
-		tgid=0
-		l=[]		
+			setattr(self,attr,tuple(l))
 
-                try:
-			while int(tgid) <> -1:
-				res = self.scanner.raw(cmd)
-				(sli,tgid) = res.split(',')
-				l.append(tgid)
+		return 1
 
-		except CommandError:
-			self.logger.error('get_lockout_tgids(): cmd %s' % cmd)
-			return 0
+	def lockout_tgids(self, tgids, depth=8):
+
+		"""Locks out TGIDS with pipelined LOI commands and adds them to lout_tgids,
+		the lists are not read back. Returns number of TGIDs locked out.
+		On error TGIDs up to the failed command are added and 0 is returned."""
+
+		tgids = [str(t) for t in tgids]
+		cmds = [schemas['LOI'].format({'sys_index':self.sys_index,'tgid':t}) for t in tgids]
+
+		try:
+			self.scanner.raw_pipeline(cmds, depth)
+
+		except CommandError, e:
+			self.logger.error('lockout_tgids(): %s' % str(e))
+			tgids = tgids[:e.args[0]]
+			done = 0
+
+		else:
+			done = len(tgids)
+
+		lout = list(self.lout_tgids)
+		known = set(lout)
+		for t in tgids:
+			if t not in known:
+				lout.append(t)
+				known.add(t)
+		self.lout_tgids = tuple(lout)
+
+		return done
+
+	def unlock_tgids(self, tgids, depth=8):
+
+		"""Unlocks TGIDS with pipelined ULI commands and removes them from
+		lout_tgids and srch_lout_tgids. Returns number of TGIDs unlocked.
+		On error TGIDs up to the failed command are removed and 0 is returned."""
+
+		tgids = [str(t) for t in tgids]
+		cmds = [schemas['ULI'].format({'sys_index':self.sys_index,'tgid':t}) for t in tgids]
+
+		try:
+			self.scanner.raw_pipeline(cmds, depth)
 
-		self.srch_lout_tgids=tuple(l)
+		except CommandError, e:
+			self.logger.error('unlock_tgids(): %s' % str(e))
+			tgids = tgids[:e.args[0]]
+			done = 0
 
-		return 1
+		else:
+			done = len(tgids)
 
-	def unlock_tgid(self, tgid):
+		gone = set(tgids)
+		self.lout_tgids = tuple([t for t in self.lout_tgids if t not in gone])
+		self.srch_lout_tgids = tuple([t for t in self.srch_lout_tgids if t not in gone])
 
-		"""Unlock TGID."""
+		return done
 
-		cmd = ','.join(['ULI',self.sys_index,str(tgid)])
+	def sync_lockout_tgids(self, desired, depth=8):
 
-		try:
-			res = self.scanner.raw(cmd)
+		"""Makes locked out TGIDs equal to DESIRED, sending only the difference
+		to lout_tgids as read by get_data() or get_lockout_tgids().
+		Returns (locked, unlocked) counts, 0 on error."""
 
-		except CommandError:
-			self.logger.error('unlock_tgid(): cmd %s' % cmd)
-			return 0
+		desired = [str(t) for t in desired]
+		current = set(self.lout_tgids)
+		wanted = set(desired)
 
-		self.srch_lout_tgids=()
-		self.get_lockout_tgids()
+		unlock = [t for t in self.lout_tgids if t not in wanted]
+		lock = [t for t in desired if t not in current]
 
-		return 1
+		if unlock and not self.unlock_tgids(unlock, depth): return 0
+		if lock and not self.lockout_tgids(lock, depth): return 0
 
-	def lockout_tgid(self, tgid):
+		return (len(lock),len(unlock))
 
-		"""Lock out TGID."""
+	def unlock_tgid(self, tgid):
 
-		cmd = ','.join(['LOI',self.sys_index,str(tgid)])
+		"""Unlock TGID."""
 
-		try:
-			res = self.scanner.raw(cmd)
+		return self.unlock_tgids([tgid]) and 1
 
-		except CommandError:
-			self.logger.error('lockout_tgid(): cmd %s' % cmd)
-			return 0
+	def lockout_tgid(self, tgid):
 
-		self.srch_lout_tgids=()
-		self.get_lockout_tgids()
+		"""Lock out TGID."""
 
-		return 1
+		return self.lockout_tgids([tgid]) and 1
 
-class Group:
+class Group(Record):
 
         """Scanner Group class."""
 
@@ -1674,6 +3031,7 @@ class Group:
 		self.logger = logging.getLogger('uniden_api.Group')
 		
 		self.scanner = scanner
+		self.modified=False
 		self.grp_index = grp_index
 		self.sys_type = sys_type
 		self.grp_type='C'
@@ -1694,9 +3052,10 @@ class Group:
 		self.channels={}
 		self.tgids={}
 
-	def get_data(self):
+	def get_data(self, recursive=True, notify=True):
 
-		"""Get Group Information.
+		"""Get Group Information, with channels or TGIDs if RECURSIVE,
+		observers are notified of them if NOTIFY.
 		In set command, only "," parameters are not changed.
 		The set command is aborted if any format error is detected.
 		When the system protect bit is ON, except [NAME], [REV_INDEX], [FWD_INDEX],
@@ -1718,7 +3077,7 @@ class Group:
 		RANGE			Range (1-250 : 1= 0.5 mile or km)
 		GPS ENABLE		GPS Location detection (0:OFF/1:ON)"""
 
-		cmd = ','.join(['GIN',self.grp_index])
+		cmd = schemas['GIN'].query(self.grp_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -1727,47 +3086,65 @@ class Group:
 			self.logger.error('get_data(): %s' % cmd)
 			return 0
 		
-		(gin,self.grp_type,self.name,self.quick_key,self.lout,
-			self.rev_index,self.fwd_index,self.sys_index,self.chn_head,
-			self.chn_tail,self.seq_no,self.latitude,self.longitude,
-			self.grp_range,self.gps_enable) = res.split(',')
-
-		chn_index = self.chn_head
+		schemas['GIN'].parse_into(self, res)
+		self.invalidate()
 
-		while int(chn_index) <> -1:
+		if recursive:
+			try:
+				for c in self.iter_channels(notify): self.channels[c.chn_index]=c
+				for t in self.iter_tgids(notify): self.tgids[t.chn_index]=t
 
-			if self.sys_type == 'CNV':
-				c=Channel(self.scanner,chn_index)
-				c.get_data()
-				self.channels[chn_index]=c
-				chn_index=c.fwd_index
-			else:
-				t=TalkGroupID(self.scanner,chn_index)
-				t.get_data()
-				self.tgids[chn_index]=t
-				chn_index=t.fwd_index
+			except CommandError, e:
+				self.logger.error('get_data(): %s' % str(e))
+				return 0
 
 		return 1
 
-	def set_data(self):
+	def iter_channels(self, notify=False):
+
+		"""Yields channels of conventional group read one at a time,
+		they are not stored to channels. Observers are notified only if NOTIFY."""
+
+		if self.sys_type <> 'CNV': return iter(())
+
+		return walk_records(self.chn_head, lambda i: read_record(Channel(self.scanner,i), notify))
+
+	def iter_tgids(self, notify=False):
+
+		"""Yields TGIDs of trunked group read one at a time, they are not
+		stored to tgids. Observers are notified only if NOTIFY."""
+
+		if self.sys_type == 'CNV': return iter(())
+
+		return walk_records(self.chn_head, lambda i: read_record(TalkGroupID(self.scanner,i), notify))
 
-                """Set scanner group data to device."""
+	def state(self):
 
-		rsv = ''
-		cmd = ','.join(['GIN',str(self.grp_index),self.name,str(self.quick_key),
-				str(self.lout),str(self.latitude),str(self.longitude),
-				str(self.grp_range),str(self.gps_enable)])
+		"""Returns state compared by merge loads, see mark_modified()."""
+
+		return record_state(self, 'GIN')
+
+	def set_data(self, modified_only=False):
+
+                """Set scanner group data to device.
+		MODIFIED_ONLY	Set only records modified since read or set, see load()"""
+
+		cmd = schemas['GIN'].format_from(self)
 
                 try:
-			res = self.scanner.raw(cmd)
+			if not modified_only or self.modified: res = self.scanner.raw(cmd)
 
 		except CommandError:
 			self.logger.error('set_data(): %s' % cmd)
 			return 0
 
-		for c in self.channels.values(): c.set_data()
+		for c in self.channels.values():
+			if not modified_only or c.modified: c.set_data()
+
+		for t in self.tgids.values():
+			if not modified_only or t.modified: t.set_data()
 
-		for t in self.tgids.values(): t.set_data()
+		self.modified=False
 
 		return 1
 
@@ -1799,7 +3176,7 @@ class Group:
 		for i in sorted(self.channels): self.channels[i].show_brief()
 		for i in sorted(self.tgids): self.tgids[i].show_brief()
 
-	def dump(self):
+	def _dump(self):
 
                 """Dumps group data to dictionary."""
 
@@ -1826,9 +3203,15 @@ class Group:
 		return d
 
 	def load(self, name='NONAME', quick_key='.', lockout='unlock', latitude='00000000N', type='C',
-			longitude='000000000W', range='0', gps='off', tgids=[], channels=[]):
+			longitude='000000000W', range='0', gps='off', tgids=[], channels=[], merge=False):
+
+                """Loads dictionary to group class.
+		MERGE	Update channels matched by frequency (same name first) and
+			TGIDs matched by TGID in place, append the others.
+			Existing records not in the dictionary are kept. Changed
+			records are marked modified, see set_data()"""
 
-                """Loads dictionary to group class."""
+		before=self.state()
 
 		self.name=name
 		self.latitude=latitude
@@ -1845,16 +3228,26 @@ class Group:
 			self.logger.error('load(): keyerror %s' % str(e))
 			return 0
 
+		mark_modified(self, before)
+
+		tpool = merge and record_pool(self.tgids, lambda t: t.tgid) or {}
+		cpool = merge and record_pool(self.channels, lambda c: c.frq) or {}
+
 		for tgid in tgids:
-			# append tgid
-			i=self.append_tgid()
+			# existing tgid, or append one
+			i=pool_take(tpool, self.tgids, str(tgid.get('tgid','0')), tgid.get('name','NONAME'))
+			if i is None: i=self.append_tgid()
 			# load dict for tgid
 			self.tgids[i].load(**tgid)
 			# set data ? up to this time data not in scanner!
 
 		for chn in channels:
-			# append channel
-			i=self.append_channel()
+			# existing channel of this frequency, or append one
+			try:
+				i=pool_take(cpool, self.channels, frq_to_scanner(chn.get('frequency','0')), chn.get('name','NONAME'))
+			except FrequencyError:
+				i=None
+			if i is None: i=self.append_channel()
 			# load dict for tgid
 			self.channels[i].load(**chn)
 			# set data ? up to this time data not in scanner!
@@ -1865,47 +3258,166 @@ class Group:
 
 		"""Appends channel to group. Returns channel index."""
 
-		cmd = ','.join(['ACC',self.grp_index])
+		if self.scanner is None: chn_index = local_index()
+		else:
+			cmd = schemas['ACC'].format({'grp_index':self.grp_index})
 
-		try:
-			res = self.scanner.raw(cmd)
+			try:
+				res = self.scanner.raw(cmd)
 
-		except CommandError:
-			self.logger.error('append_channel(): %s' % cmd)
-			return 0
+			except CommandError:
+				self.logger.error('append_channel(): %s' % cmd)
+				return 0
+
+			chn_index = schemas['ACC'].parse(res)['chn_index']
+			if chn_index == -1: return 0
 
-		(acc,chn_index) = res.split(',')
-		if chn_index == -1: return 0
 		c=Channel(self.scanner,chn_index)
+		c.sys_index,c.grp_index=self.sys_index,self.grp_index
 		self.channels[chn_index]=c
+		link_record(self.channels,chn_index,self,'chn_head','chn_tail')
 
 		return chn_index 
 
-	def append_tgid(self):
+	def append_channels(self, n, depth=8):
 
-		"""Appends TGID to group. Returns TGID index."""
+		"""Appends N channels to group with pipelined ACC commands.
+		Returns list of channel indexes, on error indexes of channels
+		appended before the failed command."""
+
+		if self.scanner is None: return [self.append_channel() for i in range(n)]
 
-		cmd = ','.join(['ACT',self.grp_index])
+		cmds = [schemas['ACC'].format({'grp_index':self.grp_index})]*n
 
 		try:
-			res = self.scanner.raw(cmd)
+			res = self.scanner.raw_pipeline(cmds, depth)
 
-		except CommandError:
-			self.logger.error('append_tgid(): %s' % cmd)
+		except CommandError, e:
+			self.logger.error('append_channels(): %s' % str(e))
+			res = e.args[3]
+
+		l = []
+
+		for r in res:
+			chn_index = schemas['ACC'].parse(r)['chn_index']
+			if chn_index == '-1': break
+			c=Channel(self.scanner,chn_index)
+			c.sys_index,c.grp_index=self.sys_index,self.grp_index
+			self.channels[chn_index]=c
+			link_record(self.channels,chn_index,self,'chn_head','chn_tail')
+			l.append(chn_index)
+
+		return l
+
+	def load_channels(self, channels, depth=8):
+
+		"""Bulk loads list of channel dictionaries (see Channel.load()) to group
+		and sets them to device.
+		All channels are validated and free memory blocks are checked before
+		anything is created. ACC and CIN commands are pipelined.
+		Returns number of channels created and set, on error the number
+		set before it."""
+
+		l = []
+
+		for chn in channels:
+			c=Channel(self.scanner,None)
+
+			try:
+				loaded = c.load(**chn)
+
+			except FrequencyError, e:
+				self.logger.error('load_channels(): %s' % str(e))
+				loaded = 0
+
+			if not loaded:
+				self.logger.error('load_channels(): bad channel %s' % str(chn))
+				return 0
+			l.append(c)
+
+		if not self.scanner.get_free_memory_blocks(): return 0
+
+		if int(self.scanner.free_memory_blocks) < len(l):
+			self.logger.error('load_channels(): %d channels, %s free memory blocks' %
+						(len(l), self.scanner.free_memory_blocks))
 			return 0
 
-		(act,chn_index) = res.split(',')
-		if chn_index == -1: return 0 
+		indexes = self.append_channels(len(l), depth)
+
+		for i,c in zip(indexes,l):
+			c.chn_index=i
+			c.sys_index,c.grp_index=self.sys_index,self.grp_index
+			c.rev_index,c.fwd_index=self.channels[i].rev_index,self.channels[i].fwd_index
+			self.channels[i].notify('delete', self)
+			self.channels[i]=c
+			c.notify('append', self)
+
+		cmds = [schemas['CIN'].format_from(c) for c in l[:len(indexes)]]
+
+		try:
+			res = self.scanner.raw_pipeline(cmds, depth)
+
+		except CommandError, e:
+			self.logger.error('load_channels(): %s' % str(e))
+			return e.args[0]
+
+		return len(indexes)
+
+	def append_tgid(self):
+
+		"""Appends TGID to group. Returns TGID index."""
+
+		if self.scanner is None: chn_index = local_index()
+		else:
+			cmd = schemas['ACT'].format({'grp_index':self.grp_index})
+
+			try:
+				res = self.scanner.raw(cmd)
+
+			except CommandError:
+				self.logger.error('append_tgid(): %s' % cmd)
+				return 0
+
+			chn_index = schemas['ACT'].parse(res)['chn_index']
+			if chn_index == -1: return 0 
+
 		t=TalkGroupID(self.scanner,chn_index)
+		t.sys_index,t.grp_index=self.sys_index,self.grp_index
 		self.tgids[chn_index]=t
+		link_record(self.tgids,chn_index,self,'chn_head','chn_tail')
 
 		return chn_index
 
+	def sync(self):
+
+		"""Creates local channels or TGIDs (see local_index()) on the
+		scanner, in list order. Returns 1, 0 on error."""
+
+		if is_local(self.grp_index):
+			self.logger.error('sync(): group %s is not created, see System.sync()' % self.grp_index)
+			return 0
+
+		for r in self.children(): r.sys_index,r.grp_index = self.sys_index,self.grp_index
+
+		try:
+			if self.sys_type == 'CNV':
+				create_local(self.scanner, self, self.channels, 'chn_head', 'chn_tail', 'chn_index',
+					lambda r: schemas['ACC'].format({'grp_index':self.grp_index}))
+			else:
+				create_local(self.scanner, self, self.tgids, 'chn_head', 'chn_tail', 'chn_index',
+					lambda r: schemas['ACT'].format({'grp_index':self.grp_index}))
+
+		except CommandError, e:
+			self.logger.error('sync(): %s' % str(e))
+			return 0
+
+		return 1
+
 	def delete_channel(self, chn_index):
 
 		"""Deletes channel from group."""
 
-		cmd = ','.join(['DCH',str(chn_index)])
+		cmd = schemas['DCH'].format({'chn_index':chn_index})
 
 		try:
 			res = self.scanner.raw(cmd)
@@ -1914,15 +3426,29 @@ class Group:
 			self.logger.error('delete_channel(): %s' % cmd)
 			return 0
 
-		self.channels.pop(chn_index)
+		unlink_record(self.channels,chn_index,self,'chn_head','chn_tail')
 
 		return 1
 
+	def delete_channels(self, indexes=None, depth=8):
+
+		"""Deletes channels by list of indexes, all channels if indexes is None.
+		DCH commands are pipelined. Returns number of deleted channels.
+		See System.clear_group() to empty large group with three commands."""
+
+		try:
+			return delete_records(self.scanner,'DCH','chn_index',self.channels,indexes,
+					self,'chn_head','chn_tail',depth)
+
+		except CommandError, e:
+			self.logger.error('delete_channels(): %s' % str(e))
+			return 0
+
 	def delete_tgid(self, chn_index):
 
 		"""Deletes TGID from group."""
 
-		cmd = ','.join(['DCH',str(chn_index)])
+		cmd = schemas['DCH'].format({'chn_index':chn_index})
 
 		try:
 			res = self.scanner.raw(cmd)
@@ -1931,11 +3457,25 @@ class Group:
 			self.logger.error('delete_tgid(): %s' % cmd)
 			return 0
 
-		self.tgids.pop(chn_index)
+		unlink_record(self.tgids,chn_index,self,'chn_head','chn_tail')
 
 		return 1
 
-class Site:
+	def delete_tgids(self, indexes=None, depth=8):
+
+		"""Deletes TGIDs by list of indexes, all TGIDs if indexes is None.
+		DCH commands are pipelined. Returns number of deleted TGIDs.
+		See System.clear_group() to empty large group with three commands."""
+
+		try:
+			return delete_records(self.scanner,'DCH','chn_index',self.tgids,indexes,
+					self,'chn_head','chn_tail',depth)
+
+		except CommandError, e:
+			self.logger.error('delete_tgids(): %s' % str(e))
+			return 0
+
+class Site(Record):
 
         """Scanner Site class."""
 
@@ -1944,6 +3484,7 @@ class Site:
 		self.logger = logging.getLogger('uniden_api.Site')
 		
 		self.scanner = scanner
+		self.modified=False
 		self.sit_index = sit_index
 		self.name='NONAME'
 		self.quick_key='.'
@@ -1973,9 +3514,10 @@ class Site:
 
 		self.p25_band_plan={}
 
-	def get_data(self):
+	def get_data(self, recursive=True, notify=True):
 
-		"""Get Site Information.
+		"""Get Site Information, with trunk frequencies if RECURSIVE,
+		observers are notified of them if NOTIFY.
                 In set command, only "," parameters are not changed.
                 The set command is aborted if any format error is detected.
                 When the system protect bit is ON, except [NAME], [REV_INDEX], [FWD_INDEX],
@@ -2005,7 +3547,7 @@ class Site:
 		EDACS_TYPE		EDACS (WIDE/NARROW)
 		P25WAITING		P25 Waiting time (0,100,200,300, .... , 900,1000)"""
 
-		cmd = ','.join(['SIF',self.sit_index])
+		cmd = schemas['SIF'].query(self.sit_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2014,22 +3556,18 @@ class Site:
                         self.logger.error('get_data(): %s' % cmd)
 			return 0
 
-		(sif,rsv1,self.name,self.quick_key,self.hld,self.lout,
-			self.mod,self.att,self.c_ch,rsv2,rsv3,self.rev_index,
-			self.fwd_index,self.sys_index,self.chn_head,self.chn_tail,
-			self.seq_no,self.start_key,self.latitude,self.longitude,
-			self.sit_range,self.gps_enable,rsv4,self.mot_type,
-			self.edacs_type,self.p25waiting,rsv5) = res.split(',')
+		schemas['SIF'].parse_into(self, res)
+		self.invalidate()
 
-		chn_index = self.chn_head
+		if recursive:
+			try:
+				for t in self.iter_trunk_frequencies(notify): self.trunk_frqs[t.chn_index]=t
 
-		while int(chn_index) <> -1:
-			t=TrunkFrequency(self.scanner,chn_index)
-			t.get_data()
-			self.trunk_frqs[chn_index]=t
-			chn_index=t.fwd_index
+			except CommandError, e:
+				self.logger.error('get_data(): %s' % str(e))
+				return 0
 
-		cmd = ','.join(['MCP',self.sit_index])
+		cmd = schemas['MCP'].query(self.sit_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2038,16 +3576,9 @@ class Site:
                         self.logger.error('get_data(): %s' % cmd)
 			return 0
 
-		(mcp,lower1,upper1,step1,offset1,lower2,upper2,step2,offset2,
-			lower3,upper3,step3,offset3,lower4,upper4,step4,offset4,
-			lower5,upper5,step5,offset5,lower6,upper6,step6,offset6) = res.split(',')
+		self.motorola_custom_band_plan=band_plan_from_fields(schemas['MCP'].parse(res))
 
-		self.motorola_custom_band_plan={'lower': (0,lower1,lower2,lower3,lower4,lower5,lower6),
-						'upper': (0,upper1,upper2,upper3,upper4,upper5,upper6),
-						'step': (0,step1,step2,step3,step4,step5,step6),
-						'offset': (0,offset1,offset2,offset3,offset4,offset5,offset6)}
-
-		cmd = ','.join(['ABP',self.sit_index])
+		cmd = schemas['ABP'].query(self.sit_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2056,39 +3587,47 @@ class Site:
                         self.logger.error('get_data(): %s' % cmd)
 			return 0
 
-		(abp,bf_0,sf_0,bf_1,sf_1,bf_2,sf_2,bf_3,sf_3,bf_4,sf_4,bf_5,sf_5,
-			bf_6,sf_6,bf_7,sf_7,bf_8,sf_8,bf_9,sf_9,bf_A,sf_A,bf_B,sf_B,
-			bf_C,sf_C,bf_D,sf_D,bf_E,sf_E,bf_F,sf_F) = res.split(',')
+		d = schemas['ABP'].parse(res)
 
-		self.p25_band_plan = {'base_freq': [bf_0,bf_1,bf_2,bf_3,bf_4,bf_5,
-					bf_6,bf_7,bf_8,bf_9,bf_A,bf_B,bf_C,bf_D,bf_E,bf_F],
-				'spacing_freq': [sf_0,sf_1,sf_2,sf_3,sf_4,sf_5,
-					sf_6,sf_7,sf_8,sf_9,sf_A,sf_B,sf_C,sf_D,sf_E,sf_F]}
+		self.p25_band_plan = {'base_freq': [d['bf_%X' % i] for i in range(0,16)],
+				'spacing_freq': [d['sf_%X' % i] for i in range(0,16)]}
 
 		return 1
 
-	def set_data(self):
+	def iter_trunk_frequencies(self, notify=False):
 
-                """Set scanner site data to device."""
+		"""Yields trunk frequencies read one at a time, they are not stored
+		to trunk_frqs. Observers are notified only if NOTIFY."""
 
-		rsv = ''
-		cmd = ','.join(['SIF',str(self.sit_index),self.name,str(self.quick_key),
-				str(self.hld),str(self.lout),self.mod,str(self.att),str(self.c_ch),
-				rsv,rsv,str(self.start_key),str(self.latitude),str(self.longitude),
-				str(self.sit_range),str(self.gps_enable),rsv,self.mot_type,
-				self.edacs_type,str(self.p25waiting),rsv])
+		return walk_records(self.chn_head, lambda i: read_record(TrunkFrequency(self.scanner,i), notify))
+
+	def state(self):
+
+		"""Returns state compared by merge loads, see mark_modified()."""
+
+		return record_state(self, 'SIF')
+
+	def set_data(self, modified_only=False):
+
+                """Set scanner site data to device.
+		MODIFIED_ONLY	Set only records modified since read or set, see load()"""
+
+		cmd = schemas['SIF'].format_from(self)
 
                 try:
-			res = self.scanner.raw(cmd)
+			if not modified_only or self.modified: res = self.scanner.raw(cmd)
 
 		except CommandError:
                         self.logger.error('set_data(): %s' % cmd)
 			return 0
 
-		for t in self.trunk_frqs.values(): t.set_data()
+		for t in self.trunk_frqs.values():
+			if not modified_only or t.modified: t.set_data()
 
 		# TODO implement MCP/ABP set
 
+		self.modified=False
+
 		return 1
 
 	def  show(self):
@@ -2131,27 +3670,53 @@ class Site:
 
 		"""Appends trunk frequency to site. Returns trunk frequency index."""
 
-		cmd = ','.join(['ACC',self.sit_index])
+		if self.scanner is None: chn_index = local_index()
+		else:
+			cmd = schemas['ACC'].format({'grp_index':self.sit_index})
 
-		try:
-			res = self.scanner.raw(cmd)
+			try:
+				res = self.scanner.raw(cmd)
 
-		except CommandError:
-			self.logger.error('append_trunk_frq(): %s' % cmd)
-			return 0
+			except CommandError:
+				self.logger.error('append_trunk_frq(): %s' % cmd)
+				return 0
+
+			chn_index = schemas['ACC'].parse(res)['chn_index']
+			if chn_index == -1: return 0
 
-		(acc,chn_index) = res.split(',')
-		if chn_index == -1: return 0
 		t=TrunkFrequency(self.scanner,chn_index)
+		t.sys_index,t.grp_index=self.sys_index,self.sit_index
 		self.trunk_frqs[chn_index]=t
+		link_record(self.trunk_frqs,chn_index,self,'chn_head','chn_tail')
 
 		return chn_index
 
+	def sync(self):
+
+		"""Creates local trunk frequencies (see local_index()) on the
+		scanner, in list order. Returns 1, 0 on error."""
+
+		if is_local(self.sit_index):
+			self.logger.error('sync(): site %s is not created, see System.sync()' % self.sit_index)
+			return 0
+
+		for r in self.children(): r.sys_index,r.grp_index = self.sys_index,self.sit_index
+
+		try:
+			create_local(self.scanner, self, self.trunk_frqs, 'chn_head', 'chn_tail', 'chn_index',
+				lambda r: schemas['ACC'].format({'grp_index':self.sit_index}))
+
+		except CommandError, e:
+			self.logger.error('sync(): %s' % str(e))
+			return 0
+
+		return 1
+
 	def delete_trunk_frq(self, chn_index):
 
 		"""Deletes trunk frequency from group."""
 
-		cmd = ','.join(['DCH',str(chn_index)])
+		cmd = schemas['DCH'].format({'chn_index':chn_index})
 
 		try:
 			res = self.scanner.raw(cmd)
@@ -2160,11 +3725,25 @@ class Site:
 			self.logger.error('delete_trunk_frq(): %s' % cmd)
 			return 0
 
-		self.trunk_frqs.pop(chn_index)
+		unlink_record(self.trunk_frqs,chn_index,self,'chn_head','chn_tail')
 
 		return 1
 
-	def dump(self):
+	def delete_trunk_frqs(self, indexes=None, depth=8):
+
+		"""Deletes trunk frequencies by list of indexes, all if indexes is None.
+		DCH commands are pipelined, the site is not recreated as MCP/ABP band
+		plans are not set by set_data(). Returns number of deleted frequencies."""
+
+		try:
+			return delete_records(self.scanner,'DCH','chn_index',self.trunk_frqs,indexes,
+					self,'chn_head','chn_tail',depth)
+
+		except CommandError, e:
+			self.logger.error('delete_trunk_frqs(): %s' % str(e))
+			return 0
+
+	def _dump(self):
 
 		"""Dumps group data to dictionary."""
 
@@ -2181,9 +3760,8 @@ class Site:
 		mt=self.mot_type
 		et=self.edacs_type
 		pw=self.p25waiting
-		mbp=self.motorola_custom_band_plan
-		for key in mbp.keys(): mbp[key]=list(mbp[key])
-		pbp=self.p25_band_plan
+		mbp=dict([(key,list(bp)) for key,bp in self.motorola_custom_band_plan.items()])
+		pbp=dict(self.p25_band_plan)
 
 		tfqs=[]
 		for i in sorted(self.trunk_frqs): tfqs.append(self.trunk_frqs[i].dump())
@@ -2197,9 +3775,15 @@ class Site:
 
 	def load(self, name='NONAME', quick_key='.', hold='0', lockout='unlock', modulation='', attenuation='off',
 			start_key='.', latitude='00000000N', longitude='000000000W', range='0', gps='off', cch='on', 
-			band_type='', edacs='', p25_waiting='', trunk_frqs=[], motorola_bp={}, p25_bp={}):
+			band_type='', edacs='', p25_waiting='', trunk_frqs=[], motorola_bp={}, p25_bp={}, merge=False):
 
-		"""Loads dictionary to group class."""
+		"""Loads dictionary to group class.
+		MERGE	Update trunk frequencies matched by frequency in place,
+			append the others. Existing trunk frequencies not in the
+			dictionary are kept. Changed records are marked modified,
+			see set_data()"""
+
+		before=self.state()
 
 		self.name=name
 		self.mod=modulation.upper()
@@ -2226,16 +3810,24 @@ class Site:
 			self.logger.error('load(): keyerror %s' % str(e))
 			return 0
 
+		mark_modified(self, before)
+
+		pool = merge and record_pool(self.trunk_frqs, lambda t: t.frq) or {}
+
 		for tf in trunk_frqs:
-			# append trunk frequency
-			i=self.append_trunk_frq()
+			# existing trunk frequency, or append one
+			try:
+				i=pool_take(pool, self.trunk_frqs, frq_to_scanner(tf.get('frequency','0')))
+			except FrequencyError:
+				i=None
+			if i is None: i=self.append_trunk_frq()
 			# load dict for tf
 			self.trunk_frqs[i].load(**tf)
 			# set data ? up to this time data not in scanner!
 
 		return 1
 
-class Channel:
+class Channel(Record):
 
 	"""Scanner Channel class."""
 
@@ -2244,6 +3836,7 @@ class Channel:
 		self.logger = logging.getLogger('uniden_api.Channel')
 		
 		self.scanner = scanner
+		self.modified=False
 		self.chn_index = chn_index
 		self.name='NONAME'
 		self.frq='00000000'
@@ -2266,9 +3859,9 @@ class Channel:
 		self.alt_pattern='0'
 		self.vol_offset='0'
 
-	def get_data(self):
+	def get_data(self, notify=True):
 
-		"""Get Channel Information.
+		"""Get Channel Information, observers are notified if NOTIFY.
 		In set command, only "," parameters are not changed.
                 The set command is aborted if any format error is detected.
                 When the system protect bit is ON, except [NAME], [REV_INDEX], [FWD_INDEX],
@@ -2297,7 +3890,7 @@ class Channel:
 		ALT_PATTERN		Alert Light Pattern(0:ON / 1:SLow / 2:Fast)
 		VOL_OFFSET		Volume Offset (-3 - +3)"""
 
-		cmd = ','.join(['CIN',self.chn_index])
+		cmd = schemas['CIN'].query(self.chn_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2306,25 +3899,23 @@ class Channel:
 			self.logger.error('get_data(): %s' % cmd)
 			return 0
 
-		(cin,self.name,self.frq,self.mod,self.dcs,self.tlock,
-			self.lout,self.pri,self.att,self.alt,self.altl,
-			self.rev_index,self.fwd_index,self.sys_index,
-			self.grp_index,rsv1,self.audio_type,self.p25nac,
-			self.number_tag,self.alt_color,self.alt_pattern,
-			self.vol_offset) = res.split(',')
+		schemas['CIN'].parse_into(self, res)
+		self.invalidate()
+		if notify: self.notify('update')
 
 		return 1
 
+	def state(self):
+
+		"""Returns state compared by merge loads, see mark_modified()."""
+
+		return record_state(self, 'CIN')
+
 	def set_data(self):
 
 		"""Set scanner channel data to device."""
 
-		rsv = ''
-		cmd = ','.join(['CIN',self.chn_index,self.name,self.frq,self.mod,
-				str(self.dcs),str(self.tlock),str(self.lout),str(self.pri),
-				str(self.att),str(self.alt),str(self.altl),rsv,str(self.audio_type),
-				self.p25nac,str(self.number_tag),self.alt_color,str(self.alt_pattern),
-				str(self.vol_offset)])
+		cmd = schemas['CIN'].format_from(self)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2333,6 +3924,8 @@ class Channel:
 			self.logger.error('set_data(): %s' % cmd)
 			return 0
 
+		self.modified=False
+
 		return 1
 
 	def show(self):
@@ -2369,7 +3962,7 @@ class Channel:
 		print ('\t\tIndex: %s\tName: %s\tFrequency: %s\t Lockout: %s') % (self.chn_index,self.name,
 								frq_from_scanner(self.frq),human_lout[self.lout])
 
-	def dump(self):
+	def _dump(self):
 
 		"""Dumps group data to dictionary."""
 
@@ -2400,6 +3993,8 @@ class Channel:
 
 		"""Loads dictionary to group class."""
 
+		before=self.state()
+
 		self.name=name
 		self.frq=frq_to_scanner(frequency)
 		self.mod=modulation
@@ -2422,9 +4017,12 @@ class Channel:
 			self.logger.error('load(): keyerror %s' % str(e))
 			return 0
 
+		mark_modified(self, before)
+		self.notify('update')
+
 		return 1
 
-class TrunkFrequency():
+class TrunkFrequency(Record):
 
 	"""Scanner Trunk Frequency class."""
 
@@ -2433,6 +4031,7 @@ class TrunkFrequency():
 		self.logger = logging.getLogger('uniden_api.TrunkFrequency')
 
 		self.scanner = scanner
+		self.modified=False
 		self.chn_index = chn_index
 		self.frq='00000000'
 		self.lcn=''
@@ -2444,9 +4043,9 @@ class TrunkFrequency():
 		self.number_tag='NONE'
 		self.vol_offset='0'
 
-	def get_data(self):
+	def get_data(self, notify=True):
 
-		"""Get Trunk Frequency Info
+		"""Get Trunk Frequency Info, observers are notified if NOTIFY.
 		In set command, only "," parameters are not changed.
                 The set command is aborted if any format error is detected.
 		For Motorola or EDACS SCAT System, [LCN] is ignored.
@@ -2465,7 +4064,7 @@ class TrunkFrequency():
 		NUMBER_TAG		Number tag (0-999 / NONE)
 		VOL_OFFSET		Volume Offset (-3 - +3)"""
 
-		cmd = ','.join(['TFQ',self.chn_index])
+		cmd = schemas['TFQ'].query(self.chn_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2474,20 +4073,23 @@ class TrunkFrequency():
 			self.logger.error('get_data(): %s' % cmd)
 			return 0
 
-		(tfq,self.frq,self.lcn,self.lout,self.rev_index,self.fwd_index,
-			self.sys_index,self.grp_index,rsv1,self.number_tag,
-			self.vol_offset,rsv2) = res.split(',')
+		schemas['TFQ'].parse_into(self, res)
+		self.invalidate()
+		if notify: self.notify('update')
 
 		return 1
 
+	def state(self):
+
+		"""Returns state compared by merge loads, see mark_modified()."""
+
+		return record_state(self, 'TFQ')
+
 	def set_data(self):
 
 		"""Set scanner trunk frequency data to device."""
 
-		rsv = ''
-		cmd = ','.join(['TFQ',self.chn_index,self.frq,str(self.lcn),
-				str(self.lout),rsv,str(self.number_tag),
-				str(self.vol_offset),rsv])
+		cmd = schemas['TFQ'].format_from(self)
                 try:
 			res = self.scanner.raw(cmd)
 
@@ -2495,6 +4097,8 @@ class TrunkFrequency():
 			self.logger.error('set_data(): %s' % cmd)
 			return 0
 
+		self.modified=False
+
 		return 1
 
 	def show(self):
@@ -2519,7 +4123,7 @@ class TrunkFrequency():
 
 		print ('\t\tIndex: %s\tFrequency: %s') % (self.chn_index, frq_from_scanner(self.frq))
 
-	def dump(self):
+	def _dump(self):
 
 		"""Dumps group data to dictionary."""
 
@@ -2535,6 +4139,8 @@ class TrunkFrequency():
 
 		"""Loads dictionary to group class."""
 
+		before=self.state()
+
 		self.frq=frq_to_scanner(frequency)
 		self.number_tag=str(tag)
 		self.vol_offset=str(vol_offset)
@@ -2546,9 +4152,12 @@ class TrunkFrequency():
 			self.logger.error('load(): keyerror %s' % str(e))
 			return 0
 
+		mark_modified(self, before)
+		self.notify('update')
+
 		return 1
 
-class TalkGroupID():
+class TalkGroupID(Record):
 
 	"""Scanner TalkGroupID class."""
 
@@ -2557,6 +4166,7 @@ class TalkGroupID():
 		self.logger = logging.getLogger('uniden_api.TalkGroupID')
 
 		self.scanner = scanner
+		self.modified=False
 		self.chn_index = chn_index
 		self.name='NONAME'
 		self.tgid='0'
@@ -2574,9 +4184,9 @@ class TalkGroupID():
 		self.alt_pattern='0'
 		self.vol_offset='0'
 		
-	def get_data(self):
+	def get_data(self, notify=True):
 
-		"""Get TGID Information
+		"""Get TGID Information, observers are notified if NOTIFY.
 		In set command, only "," parameters are not changed.
                 The set command is aborted if any format error is detected.
                 When the system protect bit is ON, except [NAME], [REV_INDEX], [FWD_INDEX],
@@ -2600,7 +4210,7 @@ class TalkGroupID():
 		ALT_PATTERN	Alert Light Pattern(0:ON / 1:SLow / 2:Fast)
 		VOL_OFFSET	Volume Offset (-3 - +3)"""
 
-		cmd = ','.join(['TIN',self.chn_index])
+		cmd = schemas['TIN'].query(self.chn_index)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2609,22 +4219,23 @@ class TalkGroupID():
 			self.logger.error('get_data(): %s' % cmd)
 			return 0
 
-		(tin,self.name,self.tgid,self.lout,self.pri,self.alt,self.altl,
-			self.rev_index,self.fwd_index,self.sys_index,self.grp_index,
-			rsv1,self.audio_type,self.number_tag,self.alt_color,
-			self.alt_pattern,self.vol_offset) = res.split(',')
+		schemas['TIN'].parse_into(self, res)
+		self.invalidate()
+		if notify: self.notify('update')
 
 		return 1
 
+	def state(self):
+
+		"""Returns state compared by merge loads, see mark_modified()."""
+
+		return record_state(self, 'TIN')
+
 	def set_data(self):
 
 		"""Set scanner TGID data to device."""
 
-		rsv = ''
-		cmd = ','.join(['TIN',self.chn_index,self.name,str(self.tgid),str(self.lout),
-				str(self.pri),str(self.alt),str(self.altl),rsv,str(self.audio_type),
-				str(self.number_tag),self.alt_color,str(self.alt_pattern),
-				str(self.vol_offset)])
+		cmd = schemas['TIN'].format_from(self)
 
                 try:
 			res = self.scanner.raw(cmd)
@@ -2633,6 +4244,8 @@ class TalkGroupID():
 			self.logger.error('set_data(): %s' % cmd)
 			return 0
 
+		self.modified=False
+
 		return 1
 
 	def show(self):
@@ -2663,7 +4276,7 @@ class TalkGroupID():
 
 		print ('\t\tIndex: %s\tName: %s\tTGID: %s\tLockout:%s') % (self.chn_index,self.name,self.tgid,human_lout[self.lout])
 
-	def dump(self):
+	def _dump(self):
 
 		"""Dumps group data to dictionary."""
 
@@ -2686,6 +4299,8 @@ class TalkGroupID():
 
 		"""Loads dictionary to group class."""
 
+		before=self.state()
+
 		self.name=name
 		self.tgid=str(tgid)
 		self.number_tag=str(tag)
@@ -2704,9 +4319,12 @@ class TalkGroupID():
 			self.logger.error('load(): keyerror %s' % str(e))
 			return 0
 
+		mark_modified(self, before)
+		self.notify('update')
+
 		return 1
 
-class Search:
+class Search(Memo):
 
 	"""Scanner Search class."""
 
@@ -2876,28 +4494,16 @@ class Search:
 			self.logger.error('get_data(): %s' % cmd)
 			return 0
 
-		(sco,rsv1,mod,att,dly,rsv2,code_srch,bsc,rep,rsv3,rsv4,
-			max_store,rsv5,agc_analog,agc_digital,p25waiting) = sco.split(',')
-		self.srch_close_call = {'modulation':mod, 'attenuate':att, 'delay':dly, 'code_srch':code_srch,
-				'bscreen':bsc, 'repeater':rep, 'max_store':max_store, 'agc_analog':agc_analog,
-				'agc_digital':agc_digital, 'p25waiting':p25waiting }
+		self.srch_close_call = schemas['SCO'].parse(sco)
 
-		(shk,srch_key_1,srch_key_2,srch_key_3,rsv1,rsv2,rsv3) = shk.split(',')
-		self.search_key = (0,srch_key_1,srch_key_2,srch_key_3)
+		shk = schemas['SHK'].parse(shk)
+		self.search_key = (0,shk['srch_key_1'],shk['srch_key_2'],shk['srch_key_3'])
 		
-		(clc,cc_mode,cc_override,rsv1,altb,altl,altp,cc_band,
-			lout,hld,quick_key,number_tag,alt_color,alt_pattern) = clc.split(',')
-		self.close_call = {'mode':cc_mode, 'override':cc_override, 'beep':altb,
-				'level':altl, 'pause':altp, 'band':cc_band, 'lockout':lout,
-				'hold':hld, 'quick_key':quick_key, 'number_tag':number_tag,
-				'color':alt_color, 'pattern':alt_pattern}
+		self.close_call = schemas['CLC'].parse(clc)
 
-		(csg,n) = csg.split(',')
-		self.custom_search_group = tuple(n)
+		self.custom_search_group = tuple(schemas['CSG'].parse(csg)['n'])
 
-		(bsp,frq,stp,spn,max_hold) = bsp.split(',')
-		
-		self.band_scope_system = {'frequency':frq, 'step':stp, 'span':spn, 'max_hold':max_hold}		
+		self.band_scope_system = schemas['BSP'].parse(bsp)
 
 		limits={}
 		band_plan={}
@@ -2906,36 +4512,21 @@ class Search:
 		for index in range(0,10):
 
 			try:
-				bbs = self.scanner.raw(','.join(['BBS',str(index)]))
-				cbp = self.scanner.raw(','.join(['CBP',str(index)]))
-				csp = self.scanner.raw(','.join(['CSP',str(index)]))
+				bbs = self.scanner.raw(schemas['BBS'].query(index))
+				cbp = self.scanner.raw(schemas['CBP'].query(index))
+				csp = self.scanner.raw(schemas['CSP'].query(index))
 			
 			except CommandError:
 				self.logger.error('get_data(): %s' % cmd)
 				return 0
 
-			(bbs,limit_l,limit_h) = bbs.split(',')
-			limits[index]={'limit_l':limit_l, 'limit_h':limit_h}
-
-			(cbp,mot_type,lower1,upper1,step1,offset1,
-				lower2,upper2,step2,offset2,lower3,upper3,step3,offset3,
-				lower4,upper4,step4,offset4,lower5,upper5,step5,offset5,
-				lower6,upper6,step6,offset6) = cbp.split(',')
-			band_plan[index]={'mot_type':mot_type, 
-				'lower': (0,lower1,lower2,lower3,lower4,lower5,lower6),
-				'upper': (0,upper1,upper2,upper3,upper4,upper5,upper6),
-				'step': (0,step1,step2,step3,step4,step5,step6),
-				'offset': (0,offset1,offset2,offset3,offset4,offset5,offset6)}
-
-			(csp,name,limit_l,limit_h,stp,mod,att,dly,rsv1,hld,lout,cch,
-				rsv2,rsv3,quick_key,start_key,rsv4,number_tag,agc_analog,
-				agc_digital,p25waiting) = csp.split(',')
-			cust_srch[index]={'name':name, 'limit_l':limit_l, 'limit_h':limit_h,
-					'step':stp, 'modulation':mod, 'attenuation':att, 'delay':dly, 'hold':hld,
-					'lockout':lout, 'cch':cch, 'quick_key':quick_key,
-					'start_key':start_key,'number_tag':number_tag,
-					'agc_analog':agc_analog, 'agc_digital':agc_digital,
-					'p25waiting':p25waiting}
+			limits[index]=schemas['BBS'].parse(bbs)
+
+			cbp=schemas['CBP'].parse(cbp)
+			band_plan[index]=band_plan_from_fields(cbp)
+			band_plan[index]['mot_type']=cbp['mot_type']
+
+			cust_srch[index]=schemas['CSP'].parse(csp)
 
 		self.bcast_screen_band = limits
 		self.cch_custom_search_mot_band_plan = band_plan
@@ -2946,21 +4537,17 @@ class Search:
 		for index in indexes:
 
 			try:
-				ssp = self.scanner.raw(','.join(['SSP',str(index)]))
+				ssp = self.scanner.raw(schemas['SSP'].query(index))
 			
 			except CommandError:
 				self.logger.error('get_data(): %s' % cmd)
 				return 0
 
-			(ssp,srch_index,dly,att,hld,lout,quick_key,start_key,rsv1,
-				number_tag,agc_analog,agc_digital,p25waiting) = ssp.split(',')
-
-			self.service_search[index] = {'delay':dly, 'attenuation':att, 'hold':hld,
-					'lockout':lout, 'quick_key':quick_key, 'start_key':start_key,
-					'number_tag':number_tag, 'agc_analog':agc_analog,
-					'agc_digital':agc_digital, 'p25waiting':p25waiting}
+			self.service_search[index] = schemas['SSP'].parse(ssp)
+			del self.service_search[index]['srch_index']
 
 		self.get_global_lockout_frqs()
+		self.invalidate()
 
 		return 1
 
@@ -2968,21 +4555,12 @@ class Search:
 
 		"""Set scanner search data to device."""
 
-		rsv = ''
-		sco = ','.join(['SCO',rsv,self.srch_close_call['modulation'],str(self.srch_close_call['attenuate']),
-				str(self.srch_close_call['delay']),rsv,str(self.srch_close_call['code_srch']),
-				self.srch_close_call['bscreen'],str(self.srch_close_call['repeater']),rsv,rsv,
-				str(self.srch_close_call['max_store']),rsv,str(self.srch_close_call['agc_analog']),
-				str(self.srch_close_call['agc_digital']),str(self.srch_close_call['p25waiting'])])
-		shk = ','.join(['SHK',self.search_key[1],self.search_key[2],self.search_key[3],rsv,rsv,rsv])
-		clc = ','.join(['CLC',str(self.close_call['mode']),str(self.close_call['override']),rsv,
-				str(self.close_call['beep']),str(self.close_call['level']),str(self.close_call['pause']),
-				self.close_call['band'],str(self.close_call['lockout']),str(self.close_call['hold']),
-				str(self.close_call['quick_key']),str(self.close_call['number_tag']),
-				self.close_call['color'],str(self.close_call['pattern'])])
-		csg = ','.join(['CSG',''.join(self.custom_search_group)])
-		bsp = ','.join(['BSP',self.band_scope_system['frequency'],self.band_scope_system['step'],
-					self.band_scope_system['span'],str(self.band_scope_system['max_hold'])])
+		sco = schemas['SCO'].format(self.srch_close_call)
+		shk = schemas['SHK'].format({'srch_key_1':self.search_key[1], 'srch_key_2':self.search_key[2],
+					'srch_key_3':self.search_key[3]})
+		clc = schemas['CLC'].format(self.close_call)
+		csg = schemas['CSG'].format({'n':''.join(self.custom_search_group)})
+		bsp = schemas['BSP'].format(self.band_scope_system)
 	
 		try:
 			sco = self.scanner.raw(sco)
@@ -2996,20 +4574,14 @@ class Search:
 
 		for index in range(0,10):
 
-			bbs = ','.join(['BBS',str(index),str(self.bcast_screen_band[index]['limit_l']),
-					str(self.bcast_screen_band[index]['limit_h'])])
+			bbs = dict(self.bcast_screen_band[index], index=index)
+			bbs = schemas['BBS'].format(bbs)
 			cbp0 = self.cch_custom_search_mot_band_plan[index]
-			cbp = ','.join(['CBP',str(index),cbp0['mot_type']])
-			for i in range(1,7):
-				cbp = ','.join([cbp,cbp0['lower'][i],cbp0['upper'][i],
-						str(cbp0['step'][i]),cbp0['offset'][i]])
-			csp0 = self.custom_search[index]
-			csp = ','.join(['CSP',str(index),csp0['name'],csp0['limit_l'],csp0['limit_h'],
-					str(csp0['step']),csp0['modulation'],str(csp0['attenuation']),str(csp0['delay']),
-					rsv,str(csp0['hold']),str(csp0['lockout']),str(csp0['cch']),rsv,rsv,
-					str(csp0['quick_key']),str(csp0['start_key']),rsv,
-					str(csp0['number_tag']),str(csp0['agc_analog']),
-					str(csp0['agc_digital']),str(csp0['p25waiting'])])
+			cbp = band_plan_to_fields(cbp0)
+			cbp.update({'index':index, 'mot_type':cbp0['mot_type']})
+			cbp = schemas['CBP'].format(cbp)
+			csp = dict(self.custom_search[index], index=index)
+			csp = schemas['CSP'].format(csp)
 			try:
 				bbs = self.scanner.raw(bbs)
 				cbp = self.scanner.raw(cbp)
@@ -3022,11 +4594,8 @@ class Search:
 
 		for index in indexes:
 
-			ssp0=self.service_search[index]
-			ssp = ','.join(['SSP',str(index),str(ssp0['delay']),str(ssp0['attenuation']),str(ssp0['hold']),
-					str(ssp0['lockout']),str(ssp0['quick_key']),str(ssp0['start_key']),rsv,
-					str(ssp0['number_tag']),str(ssp0['agc_analog']),
-					str(ssp0['agc_digital']),str(ssp0['p25waiting'])])
+			ssp = dict(self.service_search[index], srch_index=index)
+			ssp = schemas['SSP'].format(ssp)
 			try:
 				ssp = self.scanner.raw(ssp)
 			
@@ -3044,9 +4613,8 @@ class Search:
 		FRQ		Lockout Frequency (250000-13000000)"""
 
 		frqs=[]
-		frq=0
 
-		while int(frq) <> -1:
+		while True:
 
 			try:
 				glf = self.scanner.raw('GLF')
@@ -3055,61 +4623,119 @@ class Search:
 				self.logger.error('get_global_lockout_frqs()')
 				return 0
 
-			(glf,frq) = glf.split(',')
-			frqs.append(frq)
+			frq = schemas['GLF'].parse(glf)['frq']
+			if frq == '-1': break
+			frqs.append(lockout_frq(frq))
 
 		self.global_lout_frqs = tuple(frqs)
 
-	def unlock_global_frq(self, frq):
+		return 1
 
-		"""This command unlocks a L/O frequency.
-		The frequency is deleted from L/O list.
+	def lock_global_frqs(self, frqs, depth=8):
 
-		FRQ		Lockout Frequency (250000-13000000)"""
+		"""Locks out FRQS (see lockout_frq()) with pipelined LOF commands and
+		adds them to global_lout_frqs, the list is not read back.
+		Returns number of frequencies locked out. On error frequencies up
+		to the failed command are added and 0 is returned."""
+
+		frqs = [lockout_frq(f) for f in frqs]
+		cmds = [schemas['LOF'].format({'frq':f}) for f in frqs]
 
 		try:
-			ulf = self.scanner.raw(','.join(['ULF',frq]))
+			self.scanner.raw_pipeline(cmds, depth)
 
-		except CommandError:
-			self.logger.error('unlock_global_frq(): %s' % frq)
-			return 0
+		except CommandError, e:
+			self.logger.error('lock_global_frqs(): %s' % str(e))
+			frqs = frqs[:e.args[0]]
+			done = 0
 
-		self.global_lout_frqs = ()
-		self.get_global_lockout_frqs()
+		else:
+			done = len(frqs)
 
-		return 1
+		lout = list(self.global_lout_frqs)
+		known = set(lout)
+		for f in frqs:
+			if f not in known:
+				lout.append(f)
+				known.add(f)
+		self.global_lout_frqs = tuple(lout)
 
-	def lock_global_frq(self, frq):
+		return done
 
-		"""This command locks out a frequency.
-		The frequency is added to L/O list.
+	def unlock_global_frqs(self, frqs, depth=8):
 
-		FRQ		Lockout Frequency (250000-13000000)"""
+		"""Unlocks FRQS (see lockout_frq()) with pipelined ULF commands and
+		removes them from global_lout_frqs. Returns number of frequencies
+		unlocked. On error frequencies up to the failed command are removed
+		and 0 is returned."""
+
+		frqs = [lockout_frq(f) for f in frqs]
+		cmds = [schemas['ULF'].format({'frq':f}) for f in frqs]
 
 		try:
-			ulf = self.scanner.raw(','.join(['LOF',frq]))
+			self.scanner.raw_pipeline(cmds, depth)
 
-		except CommandError:
-			self.logger.error('lock_global_frq(): %s' % frq)
-			return 0
+		except CommandError, e:
+			self.logger.error('unlock_global_frqs(): %s' % str(e))
+			frqs = frqs[:e.args[0]]
+			done = 0
 
-		self.global_lout_frqs = ()
-		self.get_global_lockout_frqs()
+		else:
+			done = len(frqs)
 
-		return 1
+		gone = set(frqs)
+		self.global_lout_frqs = tuple([f for f in self.global_lout_frqs if f not in gone])
 
-	def dump(self):
+		return done
+
+	def sync_global_lockouts(self, desired, depth=8):
+
+		"""Makes global L/O frequencies equal to DESIRED (see lockout_frq()),
+		sending only the difference to global_lout_frqs as read by get_data()
+		or get_global_lockout_frqs(). Returns (locked, unlocked) counts, 0 on error."""
+
+		desired = [lockout_frq(f) for f in desired]
+		current = set(self.global_lout_frqs)
+		wanted = set(desired)
+
+		unlock = [f for f in self.global_lout_frqs if f not in wanted]
+		lock = [f for f in desired if f not in current]
+
+		if unlock and not self.unlock_global_frqs(unlock, depth): return 0
+		if lock and not self.lock_global_frqs(lock, depth): return 0
+
+		return (len(lock),len(unlock))
+
+	def unlock_global_frq(self, frq):
+
+		"""This command unlocks a L/O frequency.
+		The frequency is deleted from L/O list.
+
+		FRQ		Lockout Frequency (250000-13000000)"""
+
+		return self.unlock_global_frqs([frq]) and 1
+
+	def lock_global_frq(self, frq):
+
+		"""This command locks out a frequency.
+		The frequency is added to L/O list.
+
+		FRQ		Lockout Frequency (250000-13000000)"""
+
+		return self.lock_global_frqs([frq]) and 1
+
+	def _dump(self):
 
 		"""Dumps group data to dictionary."""
 
-		scc=self.srch_close_call
+		scc=dict(self.srch_close_call)
 		scc['agc_analog']=human_onoff[scc['agc_analog']]
 		scc['agc_digital']=human_onoff[scc['agc_digital']]
 		scc['attenuate']=human_onoff[scc['attenuate']]
 		scc['repeater']=human_onoff[scc['repeater']]
 		scc['code_srch']=human_ctcss_dcs[scc['code_srch']]
 
-		cc=self.close_call
+		cc=dict(self.close_call)
 		cc['pattern']=human_altp[cc['pattern']]
 		cc['beep']=human_alert_tones[cc['beep']]
 		cc['level']=human_alert_tlevels[cc['level']]
@@ -3117,11 +4743,11 @@ class Search:
 		cc['lockout']=human_lout[cc['lockout']]
 		cc['mode']=human_cc_modes[cc['mode']]
 		
-		bss=self.band_scope_system
+		bss=dict(self.band_scope_system)
 		bss['frequency']=frq_from_scanner(bss['frequency'])
 		bss['step']=str(float(bss['step'])/100)
 
-		ss=self.service_search
+		ss=dict([(i,dict(v)) for i,v in self.service_search.items()])
 		indexes = (1,2,3,4,5,6,7,8,9,11,12,15)
 		for i in indexes:
 			ss[i]['agc_analog']=human_onoff[ss[i]['agc_analog']]
@@ -3129,9 +4755,9 @@ class Search:
 			ss[i]['attenuation']=human_onoff[ss[i]['attenuation']]
 			ss[i]['lockout']=human_lout[ss[i]['lockout']]
 
-		bsb=self.bcast_screen_band
-		cs=self.custom_search
-		ccsmbp=self.cch_custom_search_mot_band_plan
+		bsb=dict([(i,dict(v)) for i,v in self.bcast_screen_band.items()])
+		cs=dict([(i,dict(v)) for i,v in self.custom_search.items()])
+		ccsmbp=dict([(i,dict(v)) for i,v in self.cch_custom_search_mot_band_plan.items()])
 		for i in range(0,10):
 			bsb[i]['limit_l']=frq_from_scanner(bsb[i]['limit_l'])
 			bsb[i]['limit_h']=frq_from_scanner(bsb[i]['limit_h'])
@@ -3370,7 +4996,7 @@ class Search:
 		else: self.search_key=('','','','')
 		if len(custom_search_group) == 10: self.custom_search_group=tuple(custom_search_group)
 		else: self.custom_search_group=('','','','','','','','','','')
-		if len(global_lout_frqs)>1: self.global_lout_frqs=tuple(global_lout_frqs)
+		if global_lout_frqs: self.global_lout_frqs=tuple([lockout_frq(f) for f in global_lout_frqs if str(f) <> '-1'])
 
 if __name__ == "__main__":
 
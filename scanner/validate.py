@@ -0,0 +1,240 @@
+#!/usr/bin/python
+#
+# Uniden Scanner Python API
+# Copyright (C) 2014-2015 Anton Komarov
+#
+# This program is free software; you can redistribute it and/or modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program;
+# if not, write to the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+import yaml
+import logging
+import inspect
+import multiprocessing
+from uniden import *
+
+module_logger = logging.getLogger('uniden_api.validate')
+
+NAME_MAX = 16
+
+# receive bands of the scanner, 100 Hz units inclusive
+frq_bands = ((250000,5120000), (7580000,8239875), (8490125,8689875), (8940125,9600000),
+		(12400000,13000000))
+
+_alert_colors = color_values+('OFF',)
+
+# load() argument to valid values, per record kind
+enums = {
+	'system':{'type':scanner_sys_type, 'protected':scanner_onoff, 'lockout':scanner_lout,
+		'agc_analog':scanner_onoff, 'agc_digital':scanner_onoff, 'id_mode':scanner_id_search,
+		'status':scanner_sbit, 'end_code':scanner_end_code, 'edacs_format':scanner_afs,
+		'alert':human_alert_tones, 'alert_lvl':scanner_alert_tlevels, 'id_format':scanner_mot_id,
+		'pattern':scanner_altp, 'priority':scanner_onoff},
+	'group':{'type':('C','T','c','t'), 'lockout':scanner_lout, 'gps':scanner_onoff},
+	'site':{'lockout':scanner_lout, 'attenuation':scanner_onoff, 'gps':scanner_onoff,
+		'cch':scanner_onoff, 'modulation':mod_values},
+	'channel':{'modulation':mod_values, 'dcs':scanner_ctcss_dcs, 'tone_lockout':scanner_lout,
+		'lockout':scanner_lout, 'priority':scanner_onoff, 'attenuate':scanner_onoff,
+		'alert_tone':scanner_alert_tones, 'alert_level':scanner_alert_tlevels,
+		'audio_type':scanner_audiot, 'pattern':scanner_altp},
+	'tgid':{'lockout':scanner_lout, 'priority':scanner_onoff, 'alert_tone':scanner_alert_tones,
+		'alert_level':scanner_alert_tlevels, 'audio_type':scanner_audiot, 'pattern':scanner_altp},
+	'trunk_frq':{'lockout':scanner_lout}}
+
+# record kind to its class and child lists
+kinds = {'system':System, 'group':Group, 'site':Site, 'channel':Channel, 'tgid':TalkGroupID,
+	'trunk_frq':TrunkFrequency}
+children = {'system':(('groups','group'),('sites','site')), 'group':(('channels','channel'),('tgids','tgid')),
+	'site':(('trunk_frqs','trunk_frq'),)}
+
+_args = dict([(k, set(inspect.getargspec(c.load)[0][1:]+['merge'])) for k,c in kinds.items()])
+
+def _list_args(f):
+
+	spec = inspect.getargspec(f)
+
+	return set([a for a,v in zip(spec[0][-len(spec[3]):], spec[3]) if isinstance(v, (list,tuple,dict))])
+
+# load() arguments taking lists or dictionaries
+_lists = dict([(k, _list_args(c.load)) for k,c in kinds.items()])
+
+def _int_in(v, lower, upper):
+
+	try:
+		return lower <= int(str(v)) <= upper
+
+	except ValueError:
+		return False
+
+def _key(v, most):
+
+	"""Quick and start keys are '.' or 0..MOST."""
+
+	return str(v) == '.' or _int_in(v, 0, most)
+
+def _nac(v):
+
+	v = str(v).upper()
+
+	if v in ('','SRCH','SEARCH'): return True
+
+	try:
+		return len(v) <= 3 and 0 <= int(v, 16) <= 0xfff
+
+	except ValueError:
+		return False
+
+def _frequency(v):
+
+	try:
+		n = frq_parse(v)
+
+	except FrequencyError, e:
+		return str(e)
+
+	for lower,upper in frq_bands:
+		if lower <= n <= upper: return None
+
+	return 'out of scanner bands'
+
+def validate_record(kind, d):
+
+	"""Validates load() dictionary D of record KIND (system, group, site,
+	channel, tgid, trunk_frq), child lists are not descended.
+	Returns list of (field, value, reason)."""
+
+	if not isinstance(d, dict): return [('', d, 'not a dictionary')]
+
+	bad = []
+
+	for f in d:
+		if f not in _args[kind]: bad.append((f, d[f], 'unknown field'))
+
+	# lists and dictionaries where load() takes a value are reported, not checked
+	nonscalar = [f for f,v in d.items() if f in _args[kind] and f not in _lists[kind]
+			and not isinstance(v, (basestring,int,long,float))]
+
+	for f in nonscalar: bad.append((f, d[f], 'not a string or number'))
+
+	d = dict([(f,v) for f,v in d.items() if f not in nonscalar])
+
+	if kind == 'tgid' and 'tgid' in d and not str(d['tgid']).strip(): bad.append(('tgid', d['tgid'], 'empty'))
+
+	# blank values are allowed, as for protected systems
+	d = dict([(f,v) for f,v in d.items() if v != ''])
+
+	for f,enum in enums[kind].items():
+		if f in d and d[f] not in enum: bad.append((f, d[f], 'not one of %s' % ', '.join(sorted(map(str,enum)))))
+
+	if len(str(d.get('name', ''))) > NAME_MAX: bad.append(('name', d['name'], 'longer than %d' % NAME_MAX))
+
+	if 'alert_color' in d and str(d['alert_color']).upper() not in _alert_colors:
+		bad.append(('alert_color', d['alert_color'], 'not one of %s' % ', '.join(_alert_colors)))
+
+	if 'vol_offset' in d and not _int_in(d['vol_offset'], -3, 3):
+		bad.append(('vol_offset', d['vol_offset'], 'not in -3..3'))
+
+	if kind in ('system','site'):
+		if 'quick_key' in d and not _key(d['quick_key'], 99): bad.append(('quick_key', d['quick_key'], 'not . or 0..99'))
+		if 'start_key' in d and not _key(d['start_key'], 9): bad.append(('start_key', d['start_key'], 'not . or 0..9'))
+		if 'hold' in d and not _int_in(d['hold'], 0, 255): bad.append(('hold', d['hold'], 'not in 0..255'))
+		v = d.get('p25_waiting')
+		if v is not None and not (_int_in(v, 0, 1000) and int(str(v)) in p25w_values):
+			bad.append(('p25_waiting', v, 'not one of %s' % ', '.join(map(str,p25w_values))))
+
+	if kind == 'system':
+		if 'delay' in d and not (_int_in(d['delay'], -10, 30) and int(str(d['delay'])) in dly_values):
+			bad.append(('delay', d['delay'], 'not one of %s' % ', '.join(map(str,dly_values))))
+		if 'fleet_map' in d and not _int_in(d['fleet_map'], 0, 16):
+			bad.append(('fleet_map', d['fleet_map'], 'not in 0..16'))
+		v = str(d.get('custom_fmap', ''))
+		if v and (len(v) <> 8 or v.upper().strip('0123456789ABCDE')):
+			bad.append(('custom_fmap', v, 'not 8 block sizes 0..E'))
+		if not _nac(d.get('nac', '')): bad.append(('nac', d['nac'], 'not SRCH or 0..FFF'))
+
+	if kind == 'group':
+		if 'quick_key' in d and not _key(d['quick_key'], 9): bad.append(('quick_key', d['quick_key'], 'not . or 0..9'))
+
+	if kind == 'channel':
+		if not _nac(d.get('p25nac', '')): bad.append(('p25nac', d['p25nac'], 'not SRCH or 0..FFF'))
+
+	if kind in ('channel','trunk_frq') and 'frequency' not in nonscalar:
+		r = _frequency(d.get('frequency', '0'))
+		if r: bad.append(('frequency', d.get('frequency', '0'), r))
+
+	return bad
+
+def validate_chunk(items):
+
+	"""Validates list of (path, kind, dictionary). Returns list of
+	(path, field, value, reason). Runs in pool workers."""
+
+	return [(path,)+b for path,kind,d in items for b in validate_record(kind, d)]
+
+def flatten(systems=[], groups=[], sites=[]):
+
+	"""Returns list of (path, kind, dictionary) of all records of lists of
+	System.load(), Group.load() and Site.load() dictionaries, child lists
+	are stripped from dictionaries. Path is e.g. 'systems[0].groups[1].channels[2]'."""
+
+	items = []
+	stack = [('%s[%d]' % (attr,i), kind, d) for attr,kind,l in (('systems','system',systems),
+			('groups','group',groups), ('sites','site',sites)) for i,d in enumerate(l)]
+	stack.reverse()
+
+	while stack:
+		path, kind, d = stack.pop()
+
+		if not isinstance(d, dict):
+			items.append((path, kind, d))
+			continue
+
+		sub = []
+		for attr,k in children.get(kind, ()):
+			for i,c in enumerate(d.get(attr) or []): sub.append(('%s.%s[%d]' % (path,attr,i), k, c))
+
+		items.append((path, kind, dict([(f,v) for f,v in d.items()
+				if f not in [a for a,k in children.get(kind, ())]])))
+
+		sub.reverse()
+		stack.extend(sub)
+
+	return items
+
+def validate(systems=[], groups=[], sites=[], processes=None, chunk=2000):
+
+	"""Validates program against scanner constraints before any command is
+	sent: field values, name lengths, frequency bands, keys, delays, fleet
+	maps and NACs. Records are checked in CHUNK sized parts by a pool of
+	PROCESSES workers (all cores by default), small programs in process.
+	Returns list of (path, field, value, reason), empty if program is valid."""
+
+	items = flatten(systems, groups, sites)
+
+	if len(items) <= chunk or processes == 1: return validate_chunk(items)
+
+	pool = multiprocessing.Pool(processes)
+
+	try:
+		parts = pool.map(validate_chunk, [items[i:i+chunk] for i in xrange(0, len(items), chunk)])
+
+	finally:
+		pool.close()
+		pool.join()
+
+	return [b for part in parts for b in part]
+
+def validate_file(fname, processes=None, chunk=2000):
+
+	"""Validates YAML file of UnidenScanner.load_scan_settings(), see validate()."""
+
+	bad = validate(yaml.load(file(fname, 'r')) or [], processes=processes, chunk=chunk)
+
+	for b in bad: module_logger.error('validate_file(): %s %s=%r %s' % b)
+
+	return bad